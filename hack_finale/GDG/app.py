@@ -1,258 +1,384 @@
-"""
-Flask API Server for HarvestHub AI Backend
-Connects the frontend to the ML prediction engine
-"""
-
-from flask import Flask, jsonify, request, render_template_string
-from flask_cors import CORS
-from backend.intelligence import get_market_intelligence
-from backend.commitments import create_commitment
-import os
-
-app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
-
-# Configuration
-PORT = 5000
-HOST = '0.0.0.0'  # Allow connections from any IP
-
-@app.route('/')
-def home():
-    """Health check endpoint"""
-    return jsonify({
-        "status": "success",
-        "message": "HarvestHub AI Backend API is running",
-        "version": "1.0.0"
-    })
-
-@app.route('/api/predict', methods=['POST'])
-def predict():
-    """
-    Predict crop price based on commodity name
-    
-    Request body:
-    {
-        "commodity": "Rice"  # or "Wheat", "Banana", "Coconut"
-    }
-    
-    Returns:
-    {
-        "commodity": "Rice",
-        "generated_on": "2026-01-10T23:02:27.740192",
-        "forecast_7_days": {...},
-        "confidence_band": {...},
-        "statistics": {...},
-        "historical_comparison": {...},
-        "drivers": {...},
-        "alerts": [...],
-        "seasonal_outlook": {...}
-    }
-    """
-    try:
-        data = request.get_json()
-        
-        if not data or 'commodity' not in data:
-            return jsonify({
-                "error": "Missing 'commodity' field in request body"
-            }), 400
-        
-        commodity = data['commodity'].strip()
-        
-        # Validate commodity
-        valid_commodities = ['Rice', 'Wheat', 'Banana', 'Coconut']
-        if commodity not in valid_commodities:
-            return jsonify({
-                "error": f"Invalid commodity. Must be one of: {', '.join(valid_commodities)}"
-            }), 400
-        
-        # Get prediction from ML engine
-        result = get_market_intelligence(commodity)
-        
-        # Check for errors
-        if 'error' in result:
-            return jsonify(result), 400
-        
-        # Add statistics field for frontend compatibility
-        if 'statistics' not in result:
-            result['statistics'] = {
-                "last_price": result.get('forecast_7_days', {}).get('day_1', 0),
-                "weekly_change_pct": result.get('historical_comparison', {}).get('vs_last_week_pct', 0)
-            }
-        
-        # Add drivers and alerts if not present (for compatibility)
-        if 'drivers' not in result:
-            result['drivers'] = {
-                "positive": [],
-                "negative": []
-            }
-        
-        if 'alerts' not in result:
-            result['alerts'] = []
-        
-        return jsonify(result), 200
-        
-    except Exception as e:
-        return jsonify({
-            "error": "Internal server error",
-            "message": str(e)
-        }), 500
-
-@app.route('/api/commodities', methods=['GET'])
-def get_commodities():
-    """Get list of available commodities"""
-    return jsonify({
-        "commodities": ['Rice', 'Wheat', 'Banana', 'Coconut'],
-        "count": 4
-    }), 200
-
-@app.route('/api/health', methods=['GET'])
-def health():
-    """Health check endpoint"""
-    return jsonify({
-        "status": "healthy",
-        "service": "HarvestHub AI Backend"
-    }), 200
-
-# Commitment form HTML
-HTML_FORM = """
-<!DOCTYPE html>
-<html>
-<head>
-    <title>AI Crop Price Advisory - Activate Monitoring</title>
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            max-width: 600px;
-            margin: 50px auto;
-            padding: 20px;
-            background: #f5f5f5;
-        }
-        h2 {
-            color: #2ecc71;
-        }
-        form {
-            background: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        label {
-            display: block;
-            margin-top: 15px;
-            font-weight: bold;
-            color: #333;
-        }
-        select, input[type="number"], input[type="text"] {
-            width: 100%;
-            padding: 10px;
-            margin-top: 5px;
-            border: 1px solid #ddd;
-            border-radius: 5px;
-            font-size: 16px;
-        }
-        button {
-            background: #2ecc71;
-            color: white;
-            padding: 12px 30px;
-            border: none;
-            border-radius: 5px;
-            font-size: 16px;
-            cursor: pointer;
-            margin-top: 20px;
-        }
-        button:hover {
-            background: #27ae60;
-        }
-        .success {
-            background: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        .back-link {
-            display: inline-block;
-            margin-top: 20px;
-            color: #2ecc71;
-            text-decoration: none;
-        }
-    </style>
-</head>
-<body>
-    <h2>🌾 AI Crop Price Advisory</h2>
-    <form method="POST">
-        <label>Commodity:</label>
-        <select name="commodity" required>
-            <option value="">-- Select Crop --</option>
-            <option value="Rice">Rice</option>
-            <option value="Wheat">Wheat</option>
-            <option value="Banana">Banana</option>
-            <option value="Coconut">Coconut</option>
-        </select>
-
-        <label>Minimum Price (₹):</label>
-        <input type="number" name="min_price" step="0.01" required placeholder="e.g., 2500">
-
-        <label>Quantity (Quintal):</label>
-        <input type="number" name="quantity" required placeholder="e.g., 20">
-
-        <label>Phone Number:</label>
-        <input type="text" name="phone" required placeholder="+91XXXXXXXXXX">
-
-        <button type="submit">✅ Activate AI Monitoring</button>
-    </form>
-    <a href="/" class="back-link">← Back to API</a>
-</body>
-</html>
-"""
-
-@app.route('/commitment', methods=['GET', 'POST'])
-def commitment_form():
-    """Commitment form page for activating AI monitoring"""
-    if request.method == "POST":
-        try:
-            commodity = request.form["commodity"]
-            min_price = float(request.form["min_price"])
-            quantity = int(request.form["quantity"])
-            phone = request.form["phone"]
-
-            result = create_commitment(
-                user_phone=phone,
-                commodity=commodity,
-                quantity=quantity
-            )
-
-            return f"""
-            <div class="success">
-                <h3>✅ AI Monitoring Activated Successfully!</h3>
-                <p><strong>Commitment ID:</strong> {result['commit_id']}</p>
-                <p><strong>Commodity:</strong> {commodity}</p>
-                <p><strong>Entry Price:</strong> ₹{result['entry_price']:.2f}</p>
-                <p><strong>Minimum Price:</strong> ₹{min_price:.2f}</p>
-                <p><strong>Quantity:</strong> {quantity} quintals</p>
-                <p><strong>Phone:</strong> {phone}</p>
-                <p><strong>Status:</strong> {result['status']}</p>
-                <p style="margin-top: 20px; color: #27ae60;">
-                    🎉 Your crop is now being monitored by AI. You will receive alerts when it's time to sell!
-                </p>
-                <a href="/commitment" class="back-link">Create Another Commitment</a>
-            </div>
-            """
-        except Exception as e:
-            return f"""
-            <div class="success" style="border-left: 4px solid #e74c3c;">
-                <h3>❌ Error</h3>
-                <p>Failed to create commitment: {str(e)}</p>
-                <a href="/commitment" class="back-link">Try Again</a>
-            </div>
-            """
-
-    return render_template_string(HTML_FORM)
-
-if __name__ == '__main__':
-    print(f"🚀 Starting HarvestHub AI Backend API...")
-    print(f"📍 Server running on http://{HOST}:{PORT}")
-    print(f"📡 API endpoint: http://localhost:{PORT}/api/predict")
-    print(f"💡 Health check: http://localhost:{PORT}/api/health")
-    print(f"📝 Commitment form: http://localhost:{PORT}/commitment")
-    app.run(host=HOST, port=PORT, debug=True)
-
+"""
+Flask API Server for HarvestHub AI Backend
+Connects the frontend to the ML prediction engine
+"""
+
+from flask import Flask, jsonify, request, render_template_string, g
+from flask_cors import CORS
+from backend.intelligence import get_market_intelligence, get_market_intelligence_batch
+from backend.commitments import create_commitment
+from backend.model_registry import preload, model_info, has_model
+from backend.forecasting import HORIZONS
+from backend import metrics, dataset
+import os
+import time
+
+app = Flask(__name__)
+CORS(app)  # Enable CORS for all routes
+
+# Configuration
+PORT = 5000
+HOST = '0.0.0.0'  # Allow connections from any IP
+DEBUG = os.environ.get('HARVESTHUB_DEBUG', '1') == '1'  # dev server only; use wsgi.py in production
+
+def servable_commodities():
+    """Series in the dataset ("Rice", "Rice@Karnal", ...) that have a trained model"""
+    return [key for key in dataset.series() if has_model(key)]
+
+def valid_horizon(horizon):
+    """An int (not bool/float) from HORIZONS; 7.0 would break the forecast_{h}_days key"""
+    return isinstance(horizon, int) and not isinstance(horizon, bool) and horizon in HORIZONS
+
+def add_frontend_fields(result, horizon):
+    """Fill in fields the frontend expects but the ML engine does not produce"""
+    # Add statistics field for frontend compatibility
+    if 'statistics' not in result:
+        result['statistics'] = {
+            "last_price": result.get(f'forecast_{horizon}_days', {}).get('day_1', 0),
+            "weekly_change_pct": result.get('historical_comparison', {}).get('vs_last_week_pct', 0)
+        }
+
+    # Add drivers and alerts if not present (for compatibility)
+    if 'drivers' not in result:
+        result['drivers'] = {
+            "positive": [],
+            "negative": []
+        }
+
+    if 'alerts' not in result:
+        result['alerts'] = []
+
+    return result
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    """Per-endpoint latency and request/status counters for /api/metrics"""
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    if 'request_start' in g:
+        metrics.observe(
+            time.perf_counter() - g.request_start,
+            name='harvesthub_request_seconds',
+            endpoint=endpoint
+        )
+    metrics.inc('harvesthub_requests_total', endpoint=endpoint, status=response.status_code)
+    return response
+
+@app.route('/')
+def home():
+    """Health check endpoint"""
+    return jsonify({
+        "status": "success",
+        "message": "HarvestHub AI Backend API is running",
+        "version": "1.0.0"
+    })
+
+@app.route('/api/predict', methods=['POST'])
+def predict():
+    """
+    Predict crop price based on commodity name
+    
+    Request body:
+    {
+        "commodity": "Rice",  # or "Wheat", "Banana", "Coconut"
+        "horizon": 7          # optional: 7, 14 or 30 days
+    }
+    
+    Returns:
+    {
+        "commodity": "Rice",
+        "generated_on": "2026-01-10T23:02:27.740192",
+        "forecast_7_days": {...},
+        "confidence_band": {...},
+        "statistics": {...},
+        "historical_comparison": {...},
+        "drivers": {...},
+        "alerts": [...],
+        "seasonal_outlook": {...},
+        "cache": {"hit": true, "age_seconds": 12.5}
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'commodity' not in data:
+            return jsonify({
+                "error": "Missing 'commodity' field in request body"
+            }), 400
+        
+        commodity = data['commodity'].strip()
+        
+        # Validate commodity
+        available = servable_commodities()
+        if commodity not in available:
+            return jsonify({
+                "error": f"Invalid commodity. Must be one of: {', '.join(available)}"
+            }), 400
+        
+        horizon = data.get('horizon', 7)
+        if not valid_horizon(horizon):
+            return jsonify({
+                "error": f"Invalid horizon. Must be one of: {', '.join(map(str, HORIZONS))}"
+            }), 400
+
+        # Get prediction from ML engine
+        result = get_market_intelligence(commodity, horizon)
+        
+        # Check for errors
+        if 'error' in result:
+            return jsonify(result), 400
+        
+        return jsonify(add_frontend_fields(result, horizon)), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Internal server error",
+            "message": str(e)
+        }), 500
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Predict prices for several commodities in one round-trip
+    
+    Request body:
+    {
+        "commodities": ["Rice", "Wheat"],  # or "all"
+        "horizon": 7                       # optional: 7, 14 or 30 days
+    }
+    
+    Returns:
+    {
+        "horizon": 7,
+        "count": 2,
+        "results": {"Rice": {...}, "Wheat": {...}}
+    }
+    
+    Each result has the same shape as /api/predict; a commodity without
+    enough data gets an "error" entry instead of failing the whole batch.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'commodities' not in data:
+            return jsonify({
+                "error": "Missing 'commodities' field in request body"
+            }), 400
+        
+        available = servable_commodities()
+        commodities = data['commodities']
+        if commodities == 'all':
+            commodities = available
+        
+        if not isinstance(commodities, list) or not commodities:
+            return jsonify({
+                "error": "'commodities' must be a non-empty list or \"all\""
+            }), 400
+        
+        commodities = list(dict.fromkeys(str(c).strip() for c in commodities))
+        invalid = [c for c in commodities if c not in available]
+        if invalid:
+            return jsonify({
+                "error": f"Invalid commodity: {', '.join(invalid)}. Must be one of: {', '.join(available)}"
+            }), 400
+        
+        horizon = data.get('horizon', 7)
+        if not valid_horizon(horizon):
+            return jsonify({
+                "error": f"Invalid horizon. Must be one of: {', '.join(map(str, HORIZONS))}"
+            }), 400
+        
+        results = get_market_intelligence_batch(commodities, horizon)
+        
+        return jsonify({
+            "horizon": horizon,
+            "count": len(results),
+            "results": {
+                commodity: result if 'error' in result else add_frontend_fields(result, horizon)
+                for commodity, result in results.items()
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Internal server error",
+            "message": str(e)
+        }), 500
+
+@app.route('/api/commodities', methods=['GET'])
+def get_commodities():
+    """Get list of available commodities (series with a trained model)"""
+    commodities = servable_commodities()
+    return jsonify({
+        "commodities": commodities,
+        "count": len(commodities)
+    }), 200
+
+@app.route('/api/models', methods=['GET'])
+def get_models():
+    """Loaded model versions and load times"""
+    return jsonify({
+        "models": model_info()
+    }), 200
+
+@app.route('/api/health', methods=['GET'])
+def health():
+    """Health check endpoint"""
+    return jsonify({
+        "status": "healthy",
+        "service": "HarvestHub AI Backend"
+    }), 200
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Stage latencies and request / error / cache counters (Prometheus text format)"""
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+# Commitment form HTML
+HTML_FORM = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>AI Crop Price Advisory - Activate Monitoring</title>
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            max-width: 600px;
+            margin: 50px auto;
+            padding: 20px;
+            background: #f5f5f5;
+        }
+        h2 {
+            color: #2ecc71;
+        }
+        form {
+            background: white;
+            padding: 30px;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        label {
+            display: block;
+            margin-top: 15px;
+            font-weight: bold;
+            color: #333;
+        }
+        select, input[type="number"], input[type="text"] {
+            width: 100%;
+            padding: 10px;
+            margin-top: 5px;
+            border: 1px solid #ddd;
+            border-radius: 5px;
+            font-size: 16px;
+        }
+        button {
+            background: #2ecc71;
+            color: white;
+            padding: 12px 30px;
+            border: none;
+            border-radius: 5px;
+            font-size: 16px;
+            cursor: pointer;
+            margin-top: 20px;
+        }
+        button:hover {
+            background: #27ae60;
+        }
+        .success {
+            background: white;
+            padding: 30px;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        .back-link {
+            display: inline-block;
+            margin-top: 20px;
+            color: #2ecc71;
+            text-decoration: none;
+        }
+    </style>
+</head>
+<body>
+    <h2>🌾 AI Crop Price Advisory</h2>
+    <form method="POST">
+        <label>Commodity:</label>
+        <select name="commodity" required>
+            <option value="">-- Select Crop --</option>
+            {% for commodity in commodities %}
+            <option value="{{ commodity }}">{{ commodity }}</option>
+            {% endfor %}
+        </select>
+
+        <label>Minimum Price (₹):</label>
+        <input type="number" name="min_price" step="0.01" required placeholder="e.g., 2500">
+
+        <label>Quantity (Quintal):</label>
+        <input type="number" name="quantity" required placeholder="e.g., 20">
+
+        <label>Phone Number:</label>
+        <input type="text" name="phone" required placeholder="+91XXXXXXXXXX">
+
+        <button type="submit">✅ Activate AI Monitoring</button>
+    </form>
+    <a href="/" class="back-link">← Back to API</a>
+</body>
+</html>
+"""
+
+@app.route('/commitment', methods=['GET', 'POST'])
+def commitment_form():
+    """Commitment form page for activating AI monitoring"""
+    if request.method == "POST":
+        try:
+            commodity = request.form["commodity"]
+            min_price = float(request.form["min_price"])
+            quantity = int(request.form["quantity"])
+            phone = request.form["phone"]
+
+            result = create_commitment(
+                user_phone=phone,
+                commodity=commodity,
+                quantity=quantity,
+                min_price=min_price
+            )
+
+            return f"""
+            <div class="success">
+                <h3>✅ AI Monitoring Activated Successfully!</h3>
+                <p><strong>Commitment ID:</strong> {result['commit_id']}</p>
+                <p><strong>Commodity:</strong> {commodity}</p>
+                <p><strong>Entry Price:</strong> ₹{result['entry_price']:.2f}</p>
+                <p><strong>Minimum Price:</strong> ₹{min_price:.2f}</p>
+                <p><strong>Quantity:</strong> {quantity} quintals</p>
+                <p><strong>Phone:</strong> {phone}</p>
+                <p><strong>Status:</strong> {result['status']}</p>
+                <p style="margin-top: 20px; color: #27ae60;">
+                    🎉 Your crop is now being monitored by AI. You will receive alerts when it's time to sell!
+                </p>
+                <a href="/commitment" class="back-link">Create Another Commitment</a>
+            </div>
+            """
+        except Exception as e:
+            return f"""
+            <div class="success" style="border-left: 4px solid #e74c3c;">
+                <h3>❌ Error</h3>
+                <p>Failed to create commitment: {str(e)}</p>
+                <a href="/commitment" class="back-link">Try Again</a>
+            </div>
+            """
+
+    return render_template_string(HTML_FORM, commodities=servable_commodities())
+
+if __name__ == '__main__':
+    print(f"🚀 Starting HarvestHub AI Backend API...")
+    print(f"📍 Server running on http://{HOST}:{PORT}")
+    print(f"📡 API endpoint: http://localhost:{PORT}/api/predict")
+    print(f"💡 Health check: http://localhost:{PORT}/api/health")
+    print(f"📈 Metrics: http://localhost:{PORT}/api/metrics")
+    print(f"📝 Commitment form: http://localhost:{PORT}/commitment")
+    preload()
+    app.run(host=HOST, port=PORT, debug=DEBUG)
+
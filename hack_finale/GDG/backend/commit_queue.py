@@ -0,0 +1,93 @@
+"""
+Single-writer queue for commitment rows.
+
+Request handlers hand rows to the queue and get a Future back. One
+background thread per process drains the queue and passes the rows in
+batches to a sink — commitment_store.insert_commitments, which writes
+each batch in one synchronous (fsync'd) SQLite transaction. A row's
+Future resolves only once that transaction has committed, so concurrent
+requests share an fsync but nobody is acknowledged before their row is
+durable.
+
+If a batch fails, its rows are retried one by one, so one bad row (e.g.
+a duplicate key) fails only its own Future.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+BATCH_SIZE = 200
+BATCH_WAIT_SECONDS = 0.05
+
+
+class CommitmentWriter:
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Threads do not survive fork(); start one per worker process
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid():
+                self.queue = queue.Queue()
+                self._thread = threading.Thread(
+                    target=self._run, name="commitment-writer", daemon=True
+                )
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def submit(self, row):
+        """Queue one commitment (dict) for writing; returns a Future set once it is on disk."""
+        self._ensure_started()
+        future = Future()
+        self.queue.put((row, future))
+        return future
+
+    def flush(self):
+        """Block until every queued row is on disk."""
+        if self._thread is not None and self._pid == os.getpid():
+            self.queue.join()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+
+            try:
+                while len(batch) < BATCH_SIZE:
+                    batch.append(self.queue.get(timeout=BATCH_WAIT_SECONDS))
+            except queue.Empty:
+                pass
+
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _write(self, batch):
+        try:
+            self.sink([row for row, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                print(f"❌ Failed to write commitment {batch[0][0].get('commit_id')}: {e}")
+                batch[0][1].set_exception(e)
+                return
+
+            # Isolate the failing row(s) instead of losing the whole batch
+            print(f"⚠️ Batch of {len(batch)} commitment(s) failed ({e}); retrying row by row")
+            for item in batch:
+                self._write([item])
+            return
+
+        for _, future in batch:
+            future.set_result(True)
+
@@ -0,0 +1,212 @@
+"""
+SQLite commitment repository.
+
+Replaces logs/commitments.csv. The database runs in WAL mode so the
+observer can read and update rows while web workers insert new ones.
+status and commodity are indexed, so the observer only reads active rows.
+Every update is its own transaction and is conditional on the row still
+being active.
+
+    python -m backend.commitment_store migrate [csv]   # import the old CSV
+    python -m backend.commitment_store export  [csv]   # dump to CSV
+"""
+
+import os
+import sys
+import sqlite3
+import threading
+import pandas as pd
+
+DB_FILE = "logs/commitments.db"
+CSV_FILE = "logs/commitments.csv"
+
+COLUMNS = [
+    "commit_id", "user_id", "commodity", "entry_price",
+    "quantity", "entry_date", "current_signal",
+    "last_notified_signal", "exit_price",
+    "gross_profit", "platform_fee", "status", "min_price"
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commitments (
+    commit_id            TEXT PRIMARY KEY,
+    user_id              TEXT NOT NULL,
+    commodity            TEXT NOT NULL,
+    entry_price          REAL NOT NULL,
+    quantity             INTEGER NOT NULL,
+    entry_date           TEXT NOT NULL,
+    current_signal       TEXT NOT NULL DEFAULT 'HOLD',
+    last_notified_signal TEXT,
+    exit_price           REAL,
+    gross_profit         REAL,
+    platform_fee         REAL,
+    status               TEXT NOT NULL DEFAULT 'active',
+    min_price            REAL
+);
+CREATE INDEX IF NOT EXISTS idx_commitments_status ON commitments (status);
+CREATE INDEX IF NOT EXISTS idx_commitments_commodity ON commitments (commodity);
+"""
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+# ---------------- CONNECTION ----------------
+
+def _connect():
+    os.makedirs(os.path.dirname(DB_FILE), exist_ok=True)
+
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=FULL")
+    return conn
+
+
+def _init_db():
+    with _init_lock:
+        if DB_FILE in _initialized:
+            return
+
+        is_new = not os.path.exists(DB_FILE)
+        conn = _connect()
+        conn.executescript(SCHEMA)
+        _add_missing_columns(conn)
+        conn.close()
+
+        if is_new and os.path.exists(CSV_FILE):
+            count = migrate_csv(CSV_FILE)
+            print(f"📦 Migrated {count} commitments from {CSV_FILE}")
+
+        _initialized.add(DB_FILE)
+
+
+def _add_missing_columns(conn):
+    # Databases created before min_price existed
+    existing = {row["name"] for row in conn.execute("PRAGMA table_info(commitments)")}
+    if "min_price" not in existing:
+        with conn:
+            conn.execute("ALTER TABLE commitments ADD COLUMN min_price REAL")
+
+
+def connection():
+    """One connection per thread and process (sqlite3 objects are not fork-safe)."""
+    _init_db()
+
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "pid", None) != os.getpid():
+        conn = _connect()
+        _local.conn = conn
+        _local.pid = os.getpid()
+
+    return conn
+
+
+# ---------------- REPOSITORY ----------------
+
+def insert_commitments(rows):
+    """Insert a batch of commitment dicts in one transaction."""
+    conn = connection()
+    with conn:
+        conn.executemany(
+            f"INSERT INTO commitments ({', '.join(COLUMNS)}) "
+            f"VALUES ({', '.join(':' + c for c in COLUMNS)})",
+            [{c: row.get(c) for c in COLUMNS} for row in rows]
+        )
+
+
+def active_commitments():
+    """Active rows only, served by the status index."""
+    return pd.read_sql_query(
+        "SELECT * FROM commitments WHERE status = 'active'",
+        connection()
+    )
+
+
+def get_commitment(commit_id):
+    row = connection().execute(
+        "SELECT * FROM commitments WHERE commit_id = ?", (commit_id,)
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def update_commitment(commit_id, fields):
+    """
+    Update one active commitment in its own transaction.
+    Returns False if the row was already settled by someone else.
+    """
+    assignments = ", ".join(f"{name} = :{name}" for name in fields)
+
+    conn = connection()
+    with conn:
+        cursor = conn.execute(
+            f"UPDATE commitments SET {assignments} "
+            f"WHERE commit_id = :commit_id AND status = 'active'",
+            {**fields, "commit_id": commit_id}
+        )
+
+    return cursor.rowcount == 1
+
+
+def update_commitments(df, fields):
+    """
+    Apply `fields` from every row of `df` (keyed by commit_id) in one
+    transaction. Rows that are no longer active are left untouched.
+    """
+    if df.empty:
+        return 0
+
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    values = df[fields + ["commit_id"]].astype(object)
+    values = values.where(values.notna(), None)
+
+    conn = connection()
+    with conn:
+        cursor = conn.executemany(
+            f"UPDATE commitments SET {assignments} "
+            f"WHERE commit_id = ? AND status = 'active'",
+            values.itertuples(index=False, name=None)
+        )
+
+    return cursor.rowcount
+
+
+# ---------------- MIGRATION ----------------
+
+def migrate_csv(path=CSV_FILE):
+    """Copy rows from the legacy CSV; rows already present are skipped."""
+    df = pd.read_csv(path, dtype={"user_id": str, "commit_id": str})
+    df = df.reindex(columns=COLUMNS)
+    df = df.astype(object).where(df.notna(), None)
+
+    conn = _connect()
+    with conn:
+        conn.executemany(
+            f"INSERT OR IGNORE INTO commitments ({', '.join(COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+            df[COLUMNS].itertuples(index=False, name=None)
+        )
+    conn.close()
+
+    return len(df)
+
+
+def export_csv(path=CSV_FILE):
+    df = pd.read_sql_query("SELECT * FROM commitments ORDER BY entry_date", connection())
+    df.to_csv(path, index=False)
+    return len(df)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    target = sys.argv[2] if len(sys.argv) > 2 else CSV_FILE
+
+    if command == "migrate":
+        _init_db()
+        print(f"✅ Migrated {migrate_csv(target)} rows from {target} into {DB_FILE}")
+    elif command == "export":
+        print(f"✅ Exported {export_csv(target)} rows to {target}")
+    else:
+        print("Usage: python -m backend.commitment_store [migrate|export] [csv]")
+        sys.exit(1)
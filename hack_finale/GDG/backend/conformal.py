@@ -0,0 +1,247 @@
+"""
+Conformal confidence bands.
+
+For every series and forecast day (1 .. max(HORIZONS)) we keep the most
+recent relative residuals of the recursive forecast,
+
+    residual = actual / forecast - 1
+
+and the split-conformal quantiles of each of them. A forecast path then
+gets its band in O(1) per day:
+
+    lower_bound = min over days of forecast * (1 + lower[day])
+    upper_bound = max over days of forecast * (1 + upper[day])
+
+Tables are written next to the models as models/{series}.bands.json:
+
+    python -m backend.conformal [series ...]    # offline, from walk-forward forecasts
+
+and then kept current by daily_update: each run scores the forecasts made
+on earlier days against the prices that have arrived since, and records
+today's forecast to be scored on later days (update_residuals).
+"""
+
+import os
+import sys
+import json
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from backend.dataset import get_series_frame, series
+from backend.forecasting import recursive_forecast, HORIZONS
+
+MODEL_DIR = "models"
+
+COVERAGE = 0.9
+MAX_HORIZON = max(HORIZONS)
+
+RESIDUAL_WINDOW = 365       # residuals kept per series and forecast day
+MIN_RESIDUALS = 30          # below this a day has no quantile yet
+
+_lock = threading.Lock()
+
+# series -> (file mtime, {"lower": array, "upper": array})
+_tables = {}
+
+
+def table_path(key):
+    return os.path.join(MODEL_DIR, f"{key}.bands.json")
+
+
+def _quantiles(residuals, coverage=COVERAGE):
+    """(lower, upper) conformal quantiles of one day's residuals, or (None, None)."""
+    r = np.asarray(residuals, dtype=float)
+    n = len(r)
+    if n < MIN_RESIDUALS:
+        return None, None
+
+    # Finite-sample correction: the floor((n + 1)(a/2))-th and the
+    # ceil((n + 1)(1 - a/2))-th smallest residuals (1-based, clipped to 1 .. n)
+    alpha = 1 - coverage
+    lo = min(max(int(np.floor((n + 1) * alpha / 2)), 1), n)
+    hi = min(max(int(np.ceil((n + 1) * (1 - alpha / 2))), 1), n)
+    r = np.sort(r)
+    return float(r[lo - 1]), float(r[hi - 1])
+
+
+def _empty_table():
+    return {"coverage": COVERAGE, "residuals": [[] for _ in range(MAX_HORIZON)], "pending": []}
+
+
+def load_table(key):
+    path = table_path(key)
+    if not os.path.exists(path):
+        return _empty_table()
+
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_table(key, table):
+    """Trim the residual windows, recompute the quantiles and write atomically."""
+    table["residuals"] = [r[-RESIDUAL_WINDOW:] for r in table["residuals"]]
+
+    bounds = [_quantiles(r, table["coverage"]) for r in table["residuals"]]
+    table["lower"] = [lo for lo, _ in bounds]
+    table["upper"] = [hi for _, hi in bounds]
+    table["counts"] = [len(r) for r in table["residuals"]]
+    table["updated"] = datetime.now().isoformat()
+
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    tmp = table_path(key) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(table, f)
+    os.replace(tmp, table_path(key))
+
+
+# ---------------- REQUEST TIME ----------------
+
+def table_version(key):
+    path = table_path(key)
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+def _bounds(key):
+    version = table_version(key)
+    if version is None:
+        return None
+
+    entry = _tables.get(key)
+    if entry is None or entry[0] != version:
+        with _lock:
+            table = load_table(key)
+            lower = np.array([np.nan if v is None else v for v in table.get("lower", [])])
+            upper = np.array([np.nan if v is None else v for v in table.get("upper", [])])
+            entry = (version, {"lower": lower, "upper": upper, "coverage": table["coverage"]})
+            _tables[key] = entry
+
+    return entry[1]
+
+
+def band(key, preds):
+    """
+    (lower_bound, upper_bound, coverage) for a forecast path, or None when
+    the series has no table or a day in the path has too few residuals.
+    """
+    bounds = _bounds(key)
+    preds = np.asarray(preds, dtype=float)
+    days = len(preds)
+
+    if bounds is None or len(bounds["lower"]) < days:
+        return None
+
+    lower, upper = bounds["lower"][:days], bounds["upper"][:days]
+    if np.isnan(lower).any() or np.isnan(upper).any():
+        return None
+
+    return (
+        float((preds * (1 + lower)).min()),
+        float((preds * (1 + upper)).max()),
+        bounds["coverage"]
+    )
+
+
+# ---------------- OFFLINE CALIBRATION ----------------
+
+def calibrate(keys=None, workers=None):
+    """
+    Rebuild the residual tables from walk-forward recursive forecasts over
+    the last RESIDUAL_WINDOW days of each series (backtest.run_folds, which
+    fits the global model's folds when that is the one serving).
+    Forecasts waiting to be scored are kept.
+    """
+    # backtest -> train -> backend; only needed offline
+    from backtest import run_folds
+
+    keys = keys or series()
+    parts = run_folds(keys, horizon=MAX_HORIZON, workers=workers, recent=RESIDUAL_WINDOW)
+
+    for key, folds in parts.items():
+        table = load_table(key)
+
+        if folds:
+            forecasts = np.concatenate([f[1] for f in folds])
+            actuals = np.concatenate([f[2] for f in folds])
+            residuals = actuals / forecasts - 1
+            table["residuals"] = [[round(float(v), 6) for v in residuals[:, d]] for d in range(MAX_HORIZON)]
+
+        save_table(key, table)
+        print(f"📏 {key}: {len(table['residuals'][0])} residuals per day")
+
+    return parts
+
+
+# ---------------- INCREMENTAL UPDATE ----------------
+
+def _score_pending(table, cdf):
+    """Add residuals for pending forecasts whose actual prices have arrived."""
+    dates = cdf["Date"].to_numpy()
+    prices = cdf["Daily_Mandi_Price"].to_numpy(dtype=float)
+    added = 0
+
+    for entry in table["pending"]:
+        start = int(np.searchsorted(dates, np.datetime64(pd.Timestamp(entry["origin"])), side="right"))
+        arrived = min(len(prices) - start, MAX_HORIZON)
+
+        for day in range(entry["scored"], arrived):
+            table["residuals"][day].append(round(prices[start + day] / entry["forecast"][day] - 1, 6))
+            added += 1
+
+        entry["scored"] = max(entry["scored"], arrived)
+
+    table["pending"] = [e for e in table["pending"] if e["scored"] < MAX_HORIZON]
+    return added
+
+
+def update_residuals(keys=None):
+    """
+    Score earlier forecasts against newly arrived prices and record today's
+    forecast of every series (one batched model call per day of horizon).
+    Run after new rows (and any retraining) land.
+    """
+    from backend.feature_state import get_state
+    from backend.model_registry import get_model, has_model
+
+    keys = keys or series()
+    tables, states = {}, {}
+
+    for key in keys:
+        cdf = get_series_frame(key)
+        if cdf.empty:
+            continue
+
+        table = load_table(key)
+        added = _score_pending(table, cdf)
+        tables[key] = table
+        print(f"📏 {key}: +{added} residual(s)")
+
+        origin = str(cdf["Date"].iloc[-1].date())
+        state = get_state(key)
+        if (has_model(key) and state is not None and state.ready()
+                and all(e["origin"] != origin for e in table["pending"])):
+            states[key] = (state, origin)
+
+    if states:
+        X0 = np.vstack([state.latest_features() for state, _ in states.values()])
+        windows = np.vstack([state.price_window() for state, _ in states.values()])
+        preds = recursive_forecast(
+            {key: get_model(key) for key in states}, X0, windows, MAX_HORIZON,
+            keys=np.array(list(states))
+        )
+
+        for i, (key, (_, origin)) in enumerate(states.items()):
+            tables[key]["pending"].append({
+                "origin": origin,
+                "forecast": [round(float(p), 4) for p in preds[i]],
+                "scored": 0
+            })
+
+    for key, table in tables.items():
+        save_table(key, table)
+
+    return tables
+
+
+if __name__ == "__main__":
+    calibrate(sys.argv[1:] or None)
@@ -0,0 +1,146 @@
+"""
+In-process dataset store.
+
+The dataset is loaded once and kept in memory as one date-sorted frame per
+series. Every read checks the on-disk version and reloads only when it
+has changed.
+
+A series is a commodity, or a commodity in one market when the data has a
+Market column: its key is "Rice" or "Rice@Karnal". Rows without a market
+belong to the commodity-level series. Everything downstream (feature
+state, forecasts, commitments) is keyed by the series key, and the lists
+of commodities and series come from the data.
+
+The primary on-disk format is the columnar store in backend.storage. If it
+does not exist yet it is created from the Excel workbook on first use.
+"""
+
+import os
+import threading
+import pandas as pd
+from backend import storage, metrics
+
+DATA_FILE = storage.EXCEL_FILE
+
+MARKET_COLUMN = "Market"
+SERIES_SEP = "@"
+
+_lock = threading.Lock()
+
+# (version, {series: frame}, {series: latest price}) — replaced as
+# a whole so readers never see a half-built snapshot.
+_snapshot = (None, {}, {})
+
+
+def data_version():
+    """Version of the dataset on disk (store or workbook mtime)."""
+    if storage.has_store():
+        return storage.store_version()
+
+    if os.path.exists(DATA_FILE):
+        with _lock:
+            if not storage.has_store():
+                storage.import_excel(DATA_FILE)
+        return storage.store_version()
+
+    raise FileNotFoundError(f"No dataset found in {storage.STORE_DIR} or {DATA_FILE}")
+
+
+def series_key(commodity, market=None):
+    if market is None or pd.isna(market) or market == "":
+        return commodity
+    return f"{commodity}{SERIES_SEP}{market}"
+
+
+def split_series(key):
+    """(commodity, market or None) of a series key."""
+    commodity, _, market = key.partition(SERIES_SEP)
+    return commodity, market or None
+
+
+def _load_frames():
+    frames = {}
+
+    for commodity, cdf in storage.read_frames().items():
+        if MARKET_COLUMN not in cdf.columns or cdf[MARKET_COLUMN].isna().all():
+            frames[commodity] = cdf
+            continue
+
+        for market, mdf in cdf.groupby(cdf[MARKET_COLUMN].fillna(""), sort=True):
+            frames[series_key(commodity, market)] = mdf.reset_index(drop=True)
+
+    return frames
+
+
+def _current():
+    global _snapshot
+
+    version = data_version()
+    if _snapshot[0] == version:
+        return _snapshot
+
+    with _lock:
+        if _snapshot[0] != version:
+            with metrics.timer("load_data"):
+                frames = _load_frames()
+                prices = {
+                    key: float(cdf["Daily_Mandi_Price"].iloc[-1])
+                    for key, cdf in frames.items() if not cdf.empty
+                }
+            _snapshot = (version, frames, prices)
+
+    return _snapshot
+
+
+def _frames():
+    return _current()[1]
+
+
+def reload():
+    """Drop the in-memory copy so the next read hits the disk."""
+    global _snapshot
+
+    with _lock:
+        _snapshot = (None, {}, {})
+
+
+# ---------------- PUBLIC READERS ----------------
+
+def series():
+    """Every series key in the data, e.g. ["Banana", "Rice", "Rice@Karnal"]."""
+    return list(_frames().keys())
+
+
+def commodities():
+    """Distinct commodities in the data."""
+    return sorted({split_series(key)[0] for key in _frames()})
+
+
+def get_commodity_frame(key):
+    """
+    Date-sorted history for one series (a commodity name is the key of its
+    commodity-level series). The frame is shared between callers — copy it
+    before mutating.
+    """
+    frames = _frames()
+    if key in frames:
+        return frames[key]
+
+    columns = next(iter(frames.values())).columns if frames else ["Date", "Commodity"]
+    return pd.DataFrame(columns=columns)
+
+
+get_series_frame = get_commodity_frame
+
+
+def get_dataset():
+    """Full dataset (all series) as a single frame."""
+    frames = _frames()
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames.values(), ignore_index=True)
+
+
+def latest_price(key):
+    """Most recent mandi price of a series, from an index built once per data version."""
+    return _current()[2][key]
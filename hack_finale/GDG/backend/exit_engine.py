@@ -1,22 +1,93 @@
-def decide_exit_signal(market):
-    forecast = list(market["forecast_7_days"].values())
-    seasonal = market["seasonal_outlook"]["trend"]
-    volatility = market["confidence_band"]["volatility_level"]
-
-    peak = max(forecast)
-    last = forecast[-1]
-    upside_pct = ((peak - last) / last) * 100
-
-    if forecast[-1] < forecast[-3]:
-        return "SELL", "Short-term momentum weakening"
-
-    if seasonal == "bearish":
-        return "SELL", "Seasonal demand expected to weaken"
-
-    if upside_pct < 2:
-        return "SELL", "Limited upside remaining"
-
-    if volatility == "high" and last < peak:
-        return "SELL", "High volatility with weak trend"
-
-    return "HOLD", "Trend remains favorable"
+import numpy as np
+
+HOLD, SELL = 0, 1
+SIGNALS = np.array(["HOLD", "SELL"])
+
+# Reason codes, in rule priority order after 0
+REASONS = [
+    "Trend remains favorable",
+    "Short-term momentum weakening",
+    "Seasonal demand expected to weaken",
+    "Limited upside remaining",
+    "High volatility with weak trend",
+    "Price is below your minimum price"
+]
+REASON_FAVORABLE = 0
+REASON_MOMENTUM = 1
+REASON_SEASONAL = 2
+REASON_UPSIDE = 3
+REASON_VOLATILITY = 4
+REASON_BELOW_MIN_PRICE = 5
+
+SEASONAL_CODES = {"bearish": -1, "neutral": 0, "bullish": 1}
+VOLATILITY_CODES = {"low": 0, "medium": 1, "high": 2}
+
+DEFAULT_MIN_UPSIDE_PCT = 2.0
+
+
+def decide_exit_signals(forecasts, seasonal, volatility,
+                        min_upside_pct=DEFAULT_MIN_UPSIDE_PCT,
+                        current_price=None, min_price=None,
+                        sell_on_bearish=True, sell_on_high_volatility=True):
+    """
+    Exit rules over arrays, one row per commitment (or per scenario).
+
+    forecasts        (n, horizon) price forecasts
+    seasonal         (n,) SEASONAL_CODES values
+    volatility       (n,) VOLATILITY_CODES values
+    min_upside_pct   scalar or (n,) — SELL when remaining upside is below it
+    current_price    scalar or (n,) price a SELL would settle at
+    min_price        scalar or (n,) farmer's floor; NaN means no floor
+    sell_on_*        scalar or (n,) switches for the seasonal / volatility rules
+
+    Returns (signal, reason) int arrays; map them through SIGNALS / REASONS.
+    The first matching rule wins, in the order of REASONS.
+    """
+    forecasts = np.asarray(forecasts, dtype=float)
+    seasonal = np.asarray(seasonal)
+    volatility = np.asarray(volatility)
+
+    peak = forecasts.max(axis=1)
+    last = forecasts[:, -1]
+    upside_pct = ((peak - last) / last) * 100
+
+    reason = np.select(
+        [
+            forecasts[:, -1] < forecasts[:, -3],
+            np.asarray(sell_on_bearish) & (seasonal == SEASONAL_CODES["bearish"]),
+            upside_pct < min_upside_pct,
+            np.asarray(sell_on_high_volatility)
+            & (volatility == VOLATILITY_CODES["high"]) & (last < peak)
+        ],
+        [REASON_MOMENTUM, REASON_SEASONAL, REASON_UPSIDE, REASON_VOLATILITY],
+        default=REASON_FAVORABLE
+    )
+
+    # Never advise selling below the price the farmer asked for
+    if min_price is not None and current_price is not None:
+        below = np.asarray(current_price, dtype=float) < np.asarray(min_price, dtype=float)
+        reason = np.where((reason != REASON_FAVORABLE) & below, REASON_BELOW_MIN_PRICE, reason)
+
+    signal = np.where(
+        (reason == REASON_FAVORABLE) | (reason == REASON_BELOW_MIN_PRICE), HOLD, SELL
+    )
+
+    return signal, reason
+
+
+def market_arrays(market, horizon=7):
+    """(forecast row, seasonal code, volatility code) of one market dict."""
+    forecast = np.array(list(market[f"forecast_{horizon}_days"].values()), dtype=float)
+    seasonal = SEASONAL_CODES[market["seasonal_outlook"]["trend"]]
+    volatility = VOLATILITY_CODES[market["confidence_band"]["volatility_level"]]
+    return forecast, seasonal, volatility
+
+
+def decide_exit_signal(market, **params):
+    forecast, seasonal, volatility = market_arrays(market)
+
+    signal, reason = decide_exit_signals(
+        forecast[None, :], np.array([seasonal]), np.array([volatility]), **params
+    )
+
+    return str(SIGNALS[signal[0]]), REASONS[reason[0]]
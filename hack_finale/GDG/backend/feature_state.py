@@ -0,0 +1,140 @@
+"""
+Incremental feature engine.
+
+Keeps the rolling state behind create_features (price lags, 7/14-day price
+MAs, arrival MA, rain average) for each series, so the latest feature
+vector is available without re-running create_features over the full
+history.
+
+The state follows the dataset store: when the data version changes, rows
+appended after the last seen date (e.g. by daily_update) are pushed one by
+one in O(1) each. Anything else — back-filled or rewritten history — makes
+the state rebuild itself from the tail of the frame.
+
+Training and evaluation keep using the batch create_features.
+"""
+
+import threading
+import numpy as np
+from collections import deque
+from feature_engineering import FEATURES
+from backend.dataset import data_version, get_commodity_frame, series
+
+PRICE_WINDOW = 14
+SHORT_WINDOW = 7
+
+EXOG_FEATURES = [
+    "MSP",
+    "Procurement_Season_Flag",
+    "Export_Ban_Flag",
+    "FCI_Stock_LMT",
+    "Daily_Arrivals_Tonnes",
+    "Rainfall_Deviation_Pct",
+    "Festival_Season_Flag",
+    "Fertilizer_Price_Index"
+]
+
+
+class FeatureState:
+    """Rolling feature state of one series."""
+
+    def __init__(self):
+        self.prices = deque(maxlen=PRICE_WINDOW)
+        self.arrivals = deque(maxlen=SHORT_WINDOW)
+        self.rain = deque(maxlen=SHORT_WINDOW)
+        self.last_row = None
+        self.last_date = None
+        self.rows = 0
+
+    def push(self, row):
+        self.prices.append(float(row["Daily_Mandi_Price"]))
+        self.arrivals.append(float(row["Daily_Arrivals_Tonnes"]))
+        self.rain.append(float(row["Rainfall_Deviation_Pct"]))
+        self.last_row = row
+        self.last_date = row["Date"]
+        self.rows += 1
+
+    def ready(self):
+        return len(self.prices) == PRICE_WINDOW
+
+    def feature_rows(self):
+        """Number of rows create_features would keep (after dropna)."""
+        return max(self.rows - (PRICE_WINDOW - 1), 0)
+
+    def latest_features(self):
+        """Latest feature vector in FEATURES order (= create_features(...).iloc[-1])."""
+        prices = list(self.prices)
+        ma_7 = float(np.mean(prices[-SHORT_WINDOW:]))
+        ma_14 = float(np.mean(prices))
+
+        values = {name: float(self.last_row[name]) for name in EXOG_FEATURES}
+        values.update({
+            "Price_Lag_1": prices[-2],
+            "Price_Lag_3": prices[-4],
+            "Price_Lag_7": prices[-8],
+            "Price_MA_7": ma_7,
+            "Price_MA_14": ma_14,
+            "Price_Trend": ma_7 - ma_14,
+            "Arrival_MA_7": float(np.mean(self.arrivals)),
+            "Rain_7d_Avg": float(np.mean(self.rain))
+        })
+
+        return np.array([values[name] for name in FEATURES])
+
+    def price_window(self):
+        return np.array(self.prices)
+
+
+_lock = threading.Lock()
+_states = {}
+_version = None
+
+
+def _bootstrap(cdf):
+    state = FeatureState()
+    state.rows = max(len(cdf) - PRICE_WINDOW, 0)
+
+    for _, row in cdf.tail(PRICE_WINDOW).iterrows():
+        state.push(row)
+
+    return state
+
+
+def _sync_commodity(commodity):
+    cdf = get_commodity_frame(commodity)
+    state = _states.get(commodity)
+
+    if state is None or state.last_date is None:
+        _states[commodity] = _bootstrap(cdf)
+        return
+
+    start = int(cdf["Date"].searchsorted(state.last_date, side="right"))
+    new_rows = cdf.iloc[start:]
+
+    # Pure append: everything up to last_date is unchanged
+    if start != state.rows or cdf["Date"].iloc[start - 1] != state.last_date:
+        _states[commodity] = _bootstrap(cdf)
+        return
+
+    for _, row in new_rows.iterrows():
+        state.push(row)
+
+
+def sync():
+    """Bring every series' state up to the current data version."""
+    global _version
+
+    version = data_version()
+    if version == _version:
+        return
+
+    with _lock:
+        if version != _version:
+            for key in series():
+                _sync_commodity(key)
+            _version = version
+
+
+def get_state(commodity):
+    sync()
+    return _states.get(commodity)
@@ -0,0 +1,122 @@
+"""
+Forecast cache.
+
+A commodity's forecast only depends on the dataset, on its model and on
+its confidence band table, so results are cached under (commodity, data
+version, model version, band table version), one entry per forecast
+horizon. When any of them moves on, the next lookup rebuilds the entry.
+"""
+
+import copy
+import time
+import threading
+from backend import metrics
+from backend.dataset import data_version
+from backend.model_registry import model_version
+from backend.conformal import table_version
+
+_lock = threading.Lock()
+_compute_locks = {}
+
+# (commodity, horizon) -> {"key": (data_version, model_version, table_version), "result", "created"}
+_entries = {}
+
+
+def _cache_key(commodity):
+    return (data_version(), model_version(commodity), table_version(commodity))
+
+
+def _compute_lock(slot):
+    with _lock:
+        return _compute_locks.setdefault(slot, threading.Lock())
+
+
+def _with_cache_info(entry, hit):
+    result = copy.deepcopy(entry["result"])
+    result["cache"] = {
+        "hit": hit,
+        "age_seconds": round(time.time() - entry["created"], 3)
+    }
+    return result
+
+
+def get_or_compute(commodity, compute, horizon=7):
+    """
+    Return the cached forecast for `commodity`, calling
+    compute(commodity, horizon) only when the entry is missing or stale.
+    """
+    slot = (commodity, horizon)
+    key = _cache_key(commodity)
+
+    entry = _entries.get(slot)
+    if entry is not None and entry["key"] == key:
+        metrics.inc("harvesthub_cache_hits_total", cache="forecast")
+        return _with_cache_info(entry, hit=True)
+
+    # One rebuild per slot at a time; other callers wait for it
+    with _compute_lock(slot):
+        entry = _entries.get(slot)
+        if entry is not None and entry["key"] == key:
+            metrics.inc("harvesthub_cache_hits_total", cache="forecast")
+            return _with_cache_info(entry, hit=True)
+
+        metrics.inc("harvesthub_cache_misses_total", cache="forecast")
+        entry = {
+            "key": key,
+            "result": compute(commodity, horizon),
+            "created": time.time()
+        }
+        _entries[slot] = entry
+
+    return _with_cache_info(entry, hit=False)
+
+
+def get_or_compute_many(commodities, compute_many, horizon=7):
+    """
+    Batch variant of get_or_compute. compute_many(missing, horizon) is
+    called once with every commodity whose entry is missing or stale and
+    must return {commodity: result}.
+    """
+    keys = {commodity: _cache_key(commodity) for commodity in commodities}
+
+    results = {}
+    missing = []
+    for commodity in commodities:
+        entry = _entries.get((commodity, horizon))
+        if entry is not None and entry["key"] == keys[commodity]:
+            results[commodity] = _with_cache_info(entry, hit=True)
+        else:
+            missing.append(commodity)
+
+    metrics.inc("harvesthub_cache_hits_total", len(results), cache="forecast")
+    metrics.inc("harvesthub_cache_misses_total", len(missing), cache="forecast")
+
+    if missing:
+        computed = compute_many(missing, horizon)
+        created = time.time()
+
+        for commodity in missing:
+            entry = {
+                "key": keys[commodity],
+                "result": computed[commodity],
+                "created": created
+            }
+            _entries[(commodity, horizon)] = entry
+            results[commodity] = _with_cache_info(entry, hit=False)
+
+    return results
+
+
+def invalidate(commodity=None):
+    if commodity is None:
+        _entries.clear()
+        return
+
+    for slot in [s for s in list(_entries) if s[0] == commodity]:
+        _entries.pop(slot, None)
+
+
+def warm(commodities, compute, horizon=7):
+    """Rebuild stale entries eagerly, e.g. right after daily_update."""
+    for commodity in commodities:
+        get_or_compute(commodity, compute, horizon)
@@ -0,0 +1,93 @@
+"""
+Recursive multi-horizon forecasting on NumPy arrays.
+
+Each series (a commodity, or one what-if scenario of a commodity) is
+described by two arrays:
+
+    X0      feature row used for day 1, in FEATURES order
+    window  the last WINDOW prices, oldest first
+
+After every step the prediction is pushed onto the price window and the
+lag / moving-average columns are recomputed from it, so Price_Lag_*,
+Price_MA_7, Price_MA_14 and Price_Trend match what create_features would
+produce for the forecast path. Non-price features are held at their last
+known values.
+
+All series that share a model are predicted in one call per step — with
+the global model (backend/global_model.py) that is every series at once.
+"""
+
+import numpy as np
+from feature_engineering import FEATURES
+
+HORIZONS = (7, 14, 30)
+WINDOW = 14
+
+LAG_1 = FEATURES.index("Price_Lag_1")
+LAG_3 = FEATURES.index("Price_Lag_3")
+LAG_7 = FEATURES.index("Price_Lag_7")
+MA_7 = FEATURES.index("Price_MA_7")
+MA_14 = FEATURES.index("Price_MA_14")
+TREND = FEATURES.index("Price_Trend")
+
+
+def initial_state(cdf):
+    """(X0, window) for one feature-engineered commodity frame."""
+    x0 = cdf[FEATURES].to_numpy(dtype=float)[-1]
+    window = cdf["Daily_Mandi_Price"].to_numpy(dtype=float)[-WINDOW:]
+    return x0, window
+
+
+def _update_price_features(X, window):
+    X[:, LAG_1] = window[:, -1]
+    X[:, LAG_3] = window[:, -3]
+    X[:, LAG_7] = window[:, -7]
+    X[:, MA_7] = window[:, -7:].mean(axis=1)
+    X[:, MA_14] = window[:, -14:].mean(axis=1)
+    X[:, TREND] = X[:, MA_7] - X[:, MA_14]
+
+
+def recursive_forecast(models, X0, windows, horizon=7, keys=None):
+    """
+    Forecast `horizon` days for every row of X0.
+
+    models   a single fitted model, or {key: model} together with `keys`
+    X0       (n, len(FEATURES)) day-1 feature rows
+    windows  (n, WINDOW) trailing prices, oldest first
+    keys     (n,) series key per row; needed when `models` is a dict or
+             a model that takes series keys (takes_series_keys = True)
+
+    Returns an (n, horizon) array of predicted prices.
+    """
+    X = np.array(X0, dtype=float, ndmin=2)
+    window = np.array(windows, dtype=float, ndmin=2)
+
+    if window.shape[1] < WINDOW:
+        raise ValueError(f"Need at least {WINDOW} trailing prices per series")
+
+    if keys is not None:
+        keys = np.asarray(keys)
+
+    if not isinstance(models, dict):
+        groups = [(models, np.arange(X.shape[0]))]
+    else:
+        # Keys served by the same model object share one predict call
+        by_model = {}
+        for k in np.unique(keys):
+            by_model.setdefault(id(models[k]), (models[k], []))[1].append(k)
+
+        groups = [(model, np.flatnonzero(np.isin(keys, ks))) for model, ks in by_model.values()]
+
+    out = np.empty((X.shape[0], horizon))
+
+    for step in range(horizon):
+        for model, rows in groups:
+            if getattr(model, "takes_series_keys", False):
+                out[rows, step] = model.predict(X[rows], keys[rows])
+            else:
+                out[rows, step] = model.predict(X[rows])
+
+        window = np.concatenate([window[:, 1:], out[:, step:step + 1]], axis=1)
+        _update_price_features(X, window)
+
+    return out
@@ -0,0 +1,80 @@
+"""
+One price model for every series.
+
+Instead of one XGBRegressor per commodity, a single booster is trained on
+the stacked rows of all series. To make rows of a ₹1,500 and a ₹4,000
+series comparable, the price features (and MSP) are divided by the row's
+Price_MA_14 and the model learns price / Price_MA_14. Two series-level
+features are appended:
+
+    Commodity_Code   integer code of the series' commodity (-1 if unseen)
+    Price_Level      log(Price_MA_14)
+
+A series that did not exist at training time can still be forecast: all
+it needs is its feature row. The model size does not depend on the
+number of series.
+
+predict() takes the series keys next to the feature rows, so
+recursive_forecast passes them along and every series is forecast in one
+call per step.
+"""
+
+import numpy as np
+from xgboost import XGBRegressor
+from feature_engineering import FEATURES
+from backend.dataset import split_series
+
+SERIES_FEATURES = ["Commodity_Code", "Price_Level"]
+
+SCALED = [
+    FEATURES.index(name)
+    for name in ["MSP", "Price_Lag_1", "Price_Lag_3", "Price_Lag_7",
+                 "Price_MA_7", "Price_MA_14", "Price_Trend"]
+]
+REFERENCE = FEATURES.index("Price_MA_14")
+
+
+class GlobalPriceModel:
+
+    takes_series_keys = True
+
+    def __init__(self, **params):
+        self.params = params
+        self.commodity_codes = {}
+        self.model = None
+
+    def _codes(self, keys):
+        keys = np.asarray(keys)
+        unique, inverse = np.unique(keys, return_inverse=True)
+        codes = np.array([self.commodity_codes.get(split_series(k)[0], -1) for k in unique])
+        return codes[inverse]
+
+    def _design(self, X, keys):
+        X = np.array(X, dtype=float, ndmin=2)
+        ref = X[:, REFERENCE].copy()
+        ref[ref <= 0] = 1.0
+
+        X[:, SCALED] /= ref[:, None]
+        return np.column_stack([X, self._codes(keys), np.log(ref)]), ref
+
+    def fit(self, X, y, keys, n_jobs=None):
+        self.commodity_codes = {
+            commodity: code
+            for code, commodity in enumerate(sorted({split_series(k)[0] for k in np.unique(keys)}))
+        }
+
+        Z, ref = self._design(X, keys)
+        self.model = XGBRegressor(**self.params, n_jobs=n_jobs)
+        self.model.fit(Z, np.asarray(y, dtype=float) / ref)
+
+        # Serving decides its own thread count (see model_registry.MODEL_THREADS)
+        self.model.set_params(n_jobs=None)
+        return self
+
+    def predict(self, X, keys):
+        Z, ref = self._design(X, keys)
+        return self.model.predict(Z) * ref
+
+    def set_params(self, **params):
+        self.model.set_params(**params)
+        return self
@@ -1,172 +1,215 @@
-import pandas as pd
-import joblib
-import os
-import csv
-from datetime import datetime
-from feature_engineering import create_features
-
-DATA_FILE = "data/Agriculture_Dataset_2020_2026.xlsx"
-
-LOG_DIR = "logs"
-LOG_FILE = os.path.join(LOG_DIR, "prediction_history.csv")
-
-def log_prediction(row: dict):
-    os.makedirs(LOG_DIR, exist_ok=True)
-
-    file_exists = os.path.isfile(LOG_FILE)
-
-    with open(LOG_FILE, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=row.keys())
-
-        if not file_exists:
-            writer.writeheader()
-
-        writer.writerow(row)
-
-FEATURES = [
-    "MSP",
-    "Procurement_Season_Flag",
-    "Export_Ban_Flag",
-    "FCI_Stock_LMT",
-    "Daily_Arrivals_Tonnes",
-    "Rainfall_Deviation_Pct",
-    "Festival_Season_Flag",
-    "Fertilizer_Price_Index",
-    "Price_Lag_1",
-    "Price_Lag_3",
-    "Price_Lag_7",
-    "Price_MA_7",
-    "Price_MA_14",
-    "Price_Trend",
-    "Arrival_MA_7",
-    "Rain_7d_Avg"
-]
-
-
-# ---------------- SEASONAL OUTLOOK ----------------
-
-def seasonal_outlook(date):
-    month = date.month
-
-    if month in [1, 2]:
-        return {
-            "trend": "bearish",
-            "time_horizon": "3–6 weeks",
-            "reason": "Rabi harvest approaching, supply likely to increase"
-        }
-
-    if month in [3, 4]:
-        return {
-            "trend": "bearish",
-            "time_horizon": "current",
-            "reason": "Active harvest season, high arrivals"
-        }
-
-    if month in [8, 9]:
-        return {
-            "trend": "bullish",
-            "time_horizon": "2–4 weeks",
-            "reason": "Monsoon withdrawal, supply tightening expected"
-        }
-
-    return {
-        "trend": "neutral",
-        "time_horizon": "near term",
-        "reason": "No major seasonal transition"
-    }
-
-
-# ---------------- CORE BACKEND FUNCTION ----------------
-
-def get_market_intelligence(commodity: str) -> dict:
-    df = pd.read_excel(DATA_FILE)
-    df.columns = df.columns.str.strip()
-    df["Date"] = pd.to_datetime(df["Date"])
-
-    cdf = df[df["Commodity"] == commodity].copy()
-    cdf = create_features(cdf)
-
-    if len(cdf) < 30:
-        return {
-            "error": "Not enough data to generate prediction",
-            "commodity": commodity
-        }
-
-    model = joblib.load(f"models/{commodity}.pkl")
-    latest = cdf.iloc[-1:].copy()
-
-    # ---------- 7 DAY FORECAST ----------
-    forecast = {}
-    preds = []
-
-    for day in range(1, 8):
-        pred = float(model.predict(latest[FEATURES])[0])
-        forecast[f"day_{day}"] = round(pred, 2)
-        preds.append(pred)
-
-        latest["Price_Lag_7"] = latest["Price_Lag_3"]
-        latest["Price_Lag_3"] = latest["Price_Lag_1"]
-        latest["Price_Lag_1"] = pred
-
-        latest["Price_MA_7"] = (latest["Price_MA_7"] * 6 + pred) / 7
-        latest["Price_MA_14"] = (latest["Price_MA_14"] * 13 + pred) / 14
-        latest["Price_Trend"] = latest["Price_MA_7"] - latest["Price_MA_14"]
-
-    # ---------- CONFIDENCE BAND ----------
-    recent_vol = cdf["Daily_Mandi_Price"].tail(14).std()
-    band_width = 1.5 * recent_vol
-
-    confidence_band = {
-        "lower_bound": round(min(preds) - band_width, 2),
-        "upper_bound": round(max(preds) + band_width, 2),
-        "volatility_level": (
-            "low" if recent_vol < 1.5 else
-            "medium" if recent_vol < 4 else
-            "high"
-        )
-    }
-
-    # ---------- HISTORICAL COMPARISON ----------
-    last_price = cdf["Daily_Mandi_Price"].iloc[-1]
-    price_7d_ago = cdf["Daily_Mandi_Price"].iloc[-7]
-
-    weekly_change_pct = round(
-        ((last_price - price_7d_ago) / price_7d_ago) * 100, 2
-    )
-
-    one_year_ago = latest["Date"].iloc[0] - pd.Timedelta(days=365)
-    past_year = cdf[cdf["Date"] <= one_year_ago]
-
-    yoy_change = None
-    if not past_year.empty:
-        price_last_year = past_year.iloc[-1]["Daily_Mandi_Price"]
-        yoy_change = round(
-            ((last_price - price_last_year) / price_last_year) * 100, 2
-        )
-
-    # ---------- FINAL JSON ----------
-    result = {
-        "commodity": commodity,
-        "generated_on": datetime.now().isoformat(),
-        "forecast_7_days": forecast,
-        "confidence_band": confidence_band,
-        "historical_comparison": {
-            "vs_last_week_pct": weekly_change_pct,
-            "vs_last_year_pct": yoy_change
-        },
-        "seasonal_outlook": seasonal_outlook(latest["Date"].iloc[0])
-    }
-
-    # -------- LOG PREDICTION --------
-    log_prediction({
-        "timestamp": result["generated_on"],
-        "commodity": commodity,
-        "last_price": round(last_price, 2),
-        "avg_7day_prediction": round(sum(preds) / len(preds), 2),
-        "volatility_level": confidence_band["volatility_level"],
-        "seasonal_trend": result["seasonal_outlook"]["trend"],
-        "weekly_change_pct": weekly_change_pct
-    })
-
-    return result
-
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from backend.dataset import get_commodity_frame
+from backend.model_registry import get_model, has_model
+from backend import forecast_cache, metrics, conformal
+from backend.forecasting import recursive_forecast
+from backend.feature_state import get_state
+from backend.prediction_log import prediction_logger
+
+def log_prediction(row: dict):
+    # Buffered; written by a background thread (see backend/prediction_log.py)
+    prediction_logger.log(row)
+
+
+# ---------------- VOLATILITY ----------------
+# Thresholds on the std of the last 14 prices
+
+LOW_VOLATILITY = 1.5
+HIGH_VOLATILITY = 4
+
+
+def volatility_level(recent_vol):
+    return (
+        "low" if recent_vol < LOW_VOLATILITY else
+        "medium" if recent_vol < HIGH_VOLATILITY else
+        "high"
+    )
+
+
+# ---------------- SEASONAL OUTLOOK ----------------
+
+def seasonal_outlook(date):
+    month = date.month
+
+    if month in [1, 2]:
+        return {
+            "trend": "bearish",
+            "time_horizon": "3–6 weeks",
+            "reason": "Rabi harvest approaching, supply likely to increase"
+        }
+
+    if month in [3, 4]:
+        return {
+            "trend": "bearish",
+            "time_horizon": "current",
+            "reason": "Active harvest season, high arrivals"
+        }
+
+    if month in [8, 9]:
+        return {
+            "trend": "bullish",
+            "time_horizon": "2–4 weeks",
+            "reason": "Monsoon withdrawal, supply tightening expected"
+        }
+
+    return {
+        "trend": "neutral",
+        "time_horizon": "near term",
+        "reason": "No major seasonal transition"
+    }
+
+
+# ---------------- CORE BACKEND FUNCTION ----------------
+
+@metrics.timed("market_intelligence")
+def get_market_intelligence(commodity: str, horizon: int = 7) -> dict:
+    """
+    Market intelligence for one commodity, served from the forecast cache.
+    The result carries a "cache" block with the hit flag and entry age.
+    """
+    return forecast_cache.get_or_compute(
+        commodity, _compute_market_intelligence, horizon
+    )
+
+
+@metrics.timed("market_intelligence_batch")
+def get_market_intelligence_batch(commodities, horizon: int = 7) -> dict:
+    """
+    {commodity: market intelligence} for several commodities. Cache misses
+    are computed together with one batched model call per forecast step.
+    """
+    return forecast_cache.get_or_compute_many(
+        commodities, _compute_market_intelligence_batch, horizon
+    )
+
+
+def warm_forecasts(commodities, horizon=7):
+    forecast_cache.warm(commodities, _compute_market_intelligence, horizon)
+
+
+def _compute_market_intelligence(commodity: str, horizon: int = 7) -> dict:
+    return _compute_market_intelligence_batch([commodity], horizon)[commodity]
+
+
+def _compute_market_intelligence_batch(commodities, horizon=7):
+    results = {}
+    states = {}
+
+    with metrics.timer("features"):
+        for commodity in commodities:
+            state = get_state(commodity)
+
+            if not has_model(commodity):
+                results[commodity] = {
+                    "error": "No trained model for this commodity",
+                    "commodity": commodity
+                }
+            elif state is None or not state.ready() or state.feature_rows() < 30:
+                results[commodity] = {
+                    "error": "Not enough data to generate prediction",
+                    "commodity": commodity
+                }
+            else:
+                states[commodity] = state
+
+        if not states:
+            return results
+
+        X0 = np.vstack([state.latest_features() for state in states.values()])
+        windows = np.vstack([state.price_window() for state in states.values()])
+
+    # Fetched before the forecast timer: a pickle (re)load is timed as "model_load"
+    models = {commodity: get_model(commodity) for commodity in states}
+
+    # ---------- RECURSIVE FORECAST ----------
+    with metrics.timer("forecast"):
+        preds = recursive_forecast(
+            models, X0, windows, horizon,
+            keys=np.array(list(states))
+        )
+
+    with metrics.timer("build_result"):
+        for i, commodity in enumerate(states):
+            results[commodity] = _build_result(
+                commodity, get_commodity_frame(commodity), preds[i]
+            )
+
+    return results
+
+
+def _build_result(commodity, cdf, preds):
+    preds = [float(p) for p in preds]
+    forecast = {
+        f"day_{day}": round(pred, 2)
+        for day, pred in enumerate(preds, start=1)
+    }
+    latest = cdf.iloc[-1:]
+
+    # ---------- CONFIDENCE BAND ----------
+    # Residual quantiles from backend/conformal.py; series without a
+    # calibrated table fall back to 1.5 x the recent price std
+    recent_vol = cdf["Daily_Mandi_Price"].tail(14).std()
+    band = conformal.band(commodity, preds)
+
+    if band is not None:
+        lower, upper, coverage = band
+        method = "conformal"
+    else:
+        band_width = 1.5 * recent_vol
+        lower, upper, coverage = min(preds) - band_width, max(preds) + band_width, None
+        method = "volatility"
+
+    confidence_band = {
+        "lower_bound": round(lower, 2),
+        "upper_bound": round(upper, 2),
+        "volatility_level": volatility_level(recent_vol),
+        "method": method,
+        "coverage": coverage
+    }
+
+    # ---------- HISTORICAL COMPARISON ----------
+    last_price = cdf["Daily_Mandi_Price"].iloc[-1]
+    price_7d_ago = cdf["Daily_Mandi_Price"].iloc[-7]
+
+    weekly_change_pct = round(
+        ((last_price - price_7d_ago) / price_7d_ago) * 100, 2
+    )
+
+    one_year_ago = latest["Date"].iloc[0] - pd.Timedelta(days=365)
+    past_year = cdf[cdf["Date"] <= one_year_ago]
+
+    yoy_change = None
+    if not past_year.empty:
+        price_last_year = past_year.iloc[-1]["Daily_Mandi_Price"]
+        yoy_change = round(
+            ((last_price - price_last_year) / price_last_year) * 100, 2
+        )
+
+    # ---------- FINAL JSON ----------
+    result = {
+        "commodity": commodity,
+        "generated_on": datetime.now().isoformat(),
+        f"forecast_{len(preds)}_days": forecast,
+        "confidence_band": confidence_band,
+        "historical_comparison": {
+            "vs_last_week_pct": weekly_change_pct,
+            "vs_last_year_pct": yoy_change
+        },
+        "seasonal_outlook": seasonal_outlook(latest["Date"].iloc[0])
+    }
+
+    # -------- LOG PREDICTION --------
+    log_prediction({
+        "timestamp": result["generated_on"],
+        "commodity": commodity,
+        "last_price": round(last_price, 2),
+        "avg_7day_prediction": round(sum(preds[:7]) / len(preds[:7]), 2),
+        "volatility_level": confidence_band["volatility_level"],
+        "seasonal_trend": result["seasonal_outlook"]["trend"],
+        "weekly_change_pct": weekly_change_pct
+    })
+
+    return result
+
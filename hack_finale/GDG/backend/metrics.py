@@ -0,0 +1,199 @@
+"""
+In-process metrics, exported in the Prometheus text format at /api/metrics.
+
+    with metrics.timer("observe"):
+        ...
+
+    metrics.inc("harvesthub_cache_hits_total", cache="forecast")
+
+Stage latencies go into one histogram, harvesthub_stage_seconds{stage=...};
+a stage that raises also bumps harvesthub_errors_total{stage=...}.
+
+Values live in the memory of the process that recorded them. Under
+gunicorn each worker exports its own numbers, labelled with its pid, so
+sum across pid in queries. Batch jobs (observer, daily_update) are
+separate processes: they call dump(job) before exiting, and render()
+includes the last snapshot of every job with a job="..." label.
+"""
+
+import os
+import json
+import glob
+import time
+import functools
+import threading
+from contextlib import contextmanager
+
+# Upper bounds in seconds; covers a cached forecast (~50µs) up to a full daily_update
+BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+STAGE_HISTOGRAM = "harvesthub_stage_seconds"
+SNAPSHOT_DIR = os.path.join("logs", "metrics")
+
+HELP = {
+    STAGE_HISTOGRAM: ("histogram", "Latency of each pipeline stage in seconds"),
+    "harvesthub_errors_total": ("counter", "Stages that raised, by stage"),
+    "harvesthub_request_seconds": ("histogram", "HTTP request latency in seconds, by endpoint"),
+    "harvesthub_requests_total": ("counter", "HTTP requests, by endpoint and status"),
+    "harvesthub_commitments_observed_total": ("counter", "Active commitments evaluated by the observer"),
+    "harvesthub_cache_hits_total": ("counter", "Cache hits, by cache"),
+    "harvesthub_cache_misses_total": ("counter", "Cache misses, by cache")
+}
+
+_lock = threading.Lock()
+
+# (name, labels) -> value
+_counters = {}
+
+# (name, labels) -> [bucket counts..., sum, count]
+_histograms = {}
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(seconds, name=STAGE_HISTOGRAM, **labels):
+    key = (name, _labels(labels))
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [0] * (len(BUCKETS) + 2)
+
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                h[i] += 1
+        h[-2] += seconds
+        h[-1] += 1
+
+
+@contextmanager
+def timer(stage):
+    """Time a block as `stage`; exceptions are counted and re-raised."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        inc("harvesthub_errors_total", stage=stage)
+        raise
+    finally:
+        observe(time.perf_counter() - start, stage=stage)
+
+
+def timed(stage):
+    """Decorator form of timer()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(stage):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# ---------------- EXPORT ----------------
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in items)
+    return "{" + body + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _snapshot():
+    with _lock:
+        return dict(_counters), {k: list(v) for k, v in _histograms.items()}
+
+
+def dump(job):
+    """Save this process's metrics as the latest snapshot of a batch job."""
+    counters, histograms = _snapshot()
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+
+    path = os.path.join(SNAPSHOT_DIR, f"{job}.json")
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({
+            "counters": [[n, labels, v] for (n, labels), v in counters.items()],
+            "histograms": [[n, labels, h] for (n, labels), h in histograms.items()]
+        }, f)
+    os.replace(tmp, path)
+
+
+def _job_snapshots():
+    """Counters and histograms of every dumped job, labelled with job=..."""
+    counters, histograms = {}, {}
+
+    for path in sorted(glob.glob(os.path.join(SNAPSHOT_DIR, "*.json"))):
+        job = os.path.splitext(os.path.basename(path))[0]
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        for n, labels, v in data["counters"]:
+            counters[(n, tuple(map(tuple, labels)) + (("job", job),))] = v
+        for n, labels, h in data["histograms"]:
+            histograms[(n, tuple(map(tuple, labels)) + (("job", job),))] = h
+
+    return counters, histograms
+
+
+def render():
+    """Every metric in the Prometheus text exposition format (0.0.4)."""
+    own = (("job", "api"), ("pid", os.getpid()))
+
+    counters, histograms = _snapshot()
+    counters = {(n, labels + own): v for (n, labels), v in counters.items()}
+    histograms = {(n, labels + own): h for (n, labels), h in histograms.items()}
+
+    job_counters, job_histograms = _job_snapshots()
+    counters.update(job_counters)
+    histograms.update(job_histograms)
+
+    lines = []
+    names = sorted({name for name, _ in counters} | {name for name, _ in histograms})
+
+    for name in names:
+        kind, text = HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for (n, labels), h in sorted(histograms.items()):
+            if n != name:
+                continue
+            for bound, count in zip(BUCKETS, h):
+                lines.append(f"{name}_bucket{_format_labels(labels, le=bound)} {count}")
+            lines.append(f'{name}_bucket{_format_labels(labels, le="+Inf")} {h[-1]}')
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(h[-2])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {h[-1]}")
+
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
@@ -0,0 +1,170 @@
+"""
+Model registry.
+
+Keeps the deserialized models in memory. Each lookup compares the
+pickle's mtime with the loaded version and swaps in the new model when
+train.py has written a newer file.
+
+When models/global.pkl exists (python train.py --global) it serves every
+series. Otherwise a series uses models/{series}.pkl if there is one, and
+its commodity's models/{commodity}.pkl if not.
+"""
+
+import os
+import json
+import time
+import glob
+import threading
+import joblib
+from datetime import datetime
+from backend import metrics
+from backend.dataset import split_series
+
+MODEL_DIR = "models"
+GLOBAL_MODEL = "global"
+
+# 0 keeps the thread count stored in the pickle
+MODEL_THREADS = int(os.environ.get("HARVESTHUB_MODEL_THREADS", 0))
+
+_lock = threading.Lock()
+
+# commodity -> {"model", "version", "loaded_at", "load_seconds"}
+_entries = {}
+
+
+def model_path(commodity):
+    return os.path.join(MODEL_DIR, f"{commodity}.pkl")
+
+
+def metadata_path(commodity):
+    return os.path.join(MODEL_DIR, f"{commodity}.json")
+
+
+def _load(commodity, version):
+    start = time.perf_counter()
+    with metrics.timer("model_load"):
+        model = joblib.load(model_path(commodity))
+        if MODEL_THREADS:
+            model.set_params(n_jobs=MODEL_THREADS)
+
+    return {
+        "model": model,
+        "version": version,
+        "loaded_at": datetime.now().isoformat(),
+        "load_seconds": round(time.perf_counter() - start, 4)
+    }
+
+
+def _entry(commodity):
+    version = os.path.getmtime(model_path(commodity))
+
+    entry = _entries.get(commodity)
+    if entry is not None and entry["version"] == version:
+        return entry
+
+    with _lock:
+        entry = _entries.get(commodity)
+        if entry is None or entry["version"] != version:
+            entry = _load(commodity, version)
+            _entries[commodity] = entry
+
+    return entry
+
+
+# ---------------- PUBLIC API ----------------
+
+def has_global_model():
+    return os.path.exists(model_path(GLOBAL_MODEL))
+
+
+def model_name(key):
+    """Name of the model that serves a series (or commodity)."""
+    if has_global_model():
+        return GLOBAL_MODEL
+    if os.path.exists(model_path(key)):
+        return key
+    return split_series(key)[0]
+
+
+def has_model(key):
+    """Whether a saved model can serve this series."""
+    return os.path.exists(model_path(model_name(key)))
+
+
+def get_model(key):
+    return _entry(model_name(key))["model"]
+
+
+def model_version(key):
+    """Version of the model serving `key`, or None if it has none."""
+    if not has_model(key):
+        return None
+    return _entry(model_name(key))["version"]
+
+
+def available_commodities():
+    """Commodities with their own per-commodity model."""
+    return sorted(
+        name
+        for name in (
+            os.path.splitext(os.path.basename(p))[0]
+            for p in glob.glob(os.path.join(MODEL_DIR, "*.pkl"))
+        )
+        if name != GLOBAL_MODEL
+    )
+
+
+def preload(commodities=None):
+    """Load every model up front so the first request does not pay for it."""
+    if has_global_model():
+        _entry(GLOBAL_MODEL)
+        return
+
+    for commodity in commodities or available_commodities():
+        _entry(commodity)
+
+
+def model_metadata(commodity):
+    """Training metadata written next to the pickle, or {} for older models."""
+    path = metadata_path(commodity)
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def model_info():
+    return [
+        {
+            "commodity": commodity,
+            "version": datetime.fromtimestamp(entry["version"]).isoformat(),
+            "loaded_at": entry["loaded_at"],
+            "load_seconds": entry["load_seconds"],
+            "metadata": model_metadata(commodity)
+        }
+        for commodity, entry in sorted(_entries.items())
+    ]
+
+
+def _replace(path, write):
+    tmp = path + ".tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def save_model(model, commodity, metadata=None):
+    """
+    Write a model atomically so readers never see a partial pickle.
+    Metadata, if given, goes to models/{commodity}.json the same way.
+    """
+    os.makedirs(MODEL_DIR, exist_ok=True)
+
+    if metadata is not None:
+        def write_metadata(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(metadata, f, indent=2)
+
+        _replace(metadata_path(commodity), write_metadata)
+
+    _replace(model_path(commodity), lambda tmp: joblib.dump(model, tmp))
@@ -0,0 +1,158 @@
+"""
+Outbound notification queue.
+
+The observer enqueues messages and moves on; a bounded pool of worker
+threads sends them through the configured SMS transport.
+
+- rate limited with a token bucket (the gateway's messages-per-second)
+- failed sends are retried with exponential backoff
+- deduplicated by key, normally (commit_id, signal), so a commitment is
+  never sent the same alert twice from one process
+- enqueue never blocks: when the queue is full (the gateway is falling
+  behind) the message is dropped and counted in stats["dropped"] and
+  harvesthub_notifications_dropped_total instead of stalling the
+  observer; its key is released so the same alert can be queued later
+"""
+
+import time
+import queue
+import random
+import threading
+from backend import metrics
+from backend.sms import get_transport, valid_number
+
+WORKERS = 4
+MAX_QUEUE = 10000
+RATE_PER_SECOND = 5.0
+BURST = 5
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+
+
+class TokenBucket:
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until one token is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class NotificationQueue:
+
+    def __init__(self, transport=None, workers=WORKERS, rate=RATE_PER_SECOND,
+                 burst=BURST, max_retries=MAX_RETRIES, backoff=BACKOFF_SECONDS):
+        self.transport = transport
+        self.workers = workers
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self.queue = queue.Queue(maxsize=MAX_QUEUE)
+        self.seen = set()
+        self.seen_lock = threading.Lock()
+        self.stats = {"sent": 0, "failed": 0, "retried": 0, "deduplicated": 0, "dropped": 0}
+        self.stats_lock = threading.Lock()
+        self._threads = []
+
+    def _count(self, stat):
+        # Incremented from the observer and every worker thread
+        with self.stats_lock:
+            self.stats[stat] += 1
+
+    def _start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"sms-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def enqueue(self, to_number, message, key=None):
+        """
+        Queue a message. Returns False if it was rejected (bad number),
+        already queued/sent under the same key, or dropped because the
+        queue is full.
+        """
+        to_number = str(to_number)
+        if not valid_number(to_number):
+            print(f"❌ Invalid phone format: {to_number}")
+            return False
+
+        if key is not None:
+            with self.seen_lock:
+                if key in self.seen:
+                    self._count("deduplicated")
+                    return False
+                self.seen.add(key)
+
+        self._start()
+        try:
+            self.queue.put_nowait((to_number, message, key))
+        except queue.Full:
+            self._count("dropped")
+            metrics.inc("harvesthub_notifications_dropped_total")
+            print(f"⚠️ Notification queue full, dropping SMS to {to_number}")
+            if key is not None:
+                with self.seen_lock:
+                    self.seen.discard(key)
+            return False
+
+        return True
+
+    def drain(self):
+        """Block until every queued message has been sent or given up on."""
+        self.queue.join()
+
+    def _send(self, to_number, message):
+        transport = self.transport or get_transport()
+
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                return transport.send(to_number, message)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                self._count("retried")
+                delay = self.backoff * (2 ** attempt) * (1 + random.random())
+                print(f"⚠️ SMS to {to_number} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _run(self):
+        while True:
+            to_number, message, key = self.queue.get()
+            try:
+                self._send(to_number, message)
+                self._count("sent")
+            except Exception as e:
+                self._count("failed")
+                print(f"❌ SMS sending failed: {e}")
+                # Only forgets the key, so the alert can be queued again if
+                # the signal changes back and forth. Nothing retries it: the
+                # observer has already stored the new signal as current.
+                if key is not None:
+                    with self.seen_lock:
+                        self.seen.discard(key)
+            finally:
+                self.queue.task_done()
+
+
+notifications = NotificationQueue()
@@ -1,53 +1,100 @@
-import pandas as pd
-from backend.intelligence import get_market_intelligence
-from backend.exit_engine import decide_exit_signal
-from backend.commitments import settle_commitment, _fetch_latest_price
-from backend.sms import send_sms
-
-COMMIT_FILE = "logs/commitments.csv"
-
-
-def observe_commitments():
-    df = pd.read_csv(COMMIT_FILE)
-
-    # 🔧 FORCE CORRECT DTYPES
-    df["user_id"] = df["user_id"].astype(str)
-    df["current_signal"] = df["current_signal"].astype(str)
-    df["last_notified_signal"] = df["last_notified_signal"].astype(str)
-
-    for i, row in df[df["status"] == "active"].iterrows():
-        market = get_market_intelligence(row["commodity"])
-        signal, reason = decide_exit_signal(market)
-
-        # Notify on signal change
-        if signal != row["current_signal"]:
-            df.loc[i, "current_signal"] = signal
-            df.loc[i, "last_notified_signal"] = signal
-
-            message = (
-                f"{signal} ALERT – {row['commodity']}\n\n"
-                f"Reason: {reason}\n\n"
-                f"Advisory only. Final decision is yours."
-            )
-
-            send_sms(
-                to_number=row["user_id"],
-                message=message
-            )
-
-        # SELL → settle
-        if signal == "SELL":
-            exit_price = _fetch_latest_price(row["commodity"])
-            settlement = settle_commitment(row, exit_price)
-
-            df.loc[i, "exit_price"] = settlement["exit_price"]
-            df.loc[i, "gross_profit"] = settlement["gross_profit"]
-            df.loc[i, "platform_fee"] = settlement["platform_fee"]
-            df.loc[i, "status"] = settlement["status"]
-
-    # ✅ SINGLE WRITE
-    df.to_csv(COMMIT_FILE, index=False)
-
-
-if __name__ == "__main__":
-    observe_commitments()
+from backend.intelligence import get_market_intelligence_batch
+import numpy as np
+from backend.exit_engine import decide_exit_signals, market_arrays, SIGNALS, REASONS
+from backend.commitments import settle_commitments, _fetch_latest_price, flush_commitments
+from backend.commitment_store import active_commitments, update_commitments
+from backend.notifications import notifications
+from backend import metrics
+
+UPDATE_FIELDS = [
+    "current_signal", "last_notified_signal",
+    "exit_price", "gross_profit", "platform_fee", "status"
+]
+
+
+@metrics.timed("observe")
+def observe_commitments():
+    flush_commitments()
+
+    # Only active rows are read
+    with metrics.timer("observe_read"):
+        df = active_commitments()
+    if df.empty:
+        return
+
+    metrics.inc("harvesthub_commitments_observed_total", len(df))
+
+    # ---------- ONE FORECAST PER COMMODITY ----------
+    with metrics.timer("observe_forecast"):
+        markets = get_market_intelligence_batch(df["commodity"].unique().tolist())
+
+    states = {}
+    for commodity, market in markets.items():
+        if "error" in market:
+            print(f"⚠️ Skipping {commodity}: {market['error']}")
+            continue
+        states[commodity] = market_arrays(market)
+
+    df = df[df["commodity"].isin(states)].copy()
+    if df.empty:
+        return
+
+    # ---------- EXIT RULES FOR ALL COMMITMENTS AT ONCE ----------
+    commodities = list(states)
+    idx = df["commodity"].map({c: i for i, c in enumerate(commodities)}).to_numpy()
+
+    forecasts = np.vstack([states[c][0] for c in commodities])[idx]
+    seasonal = np.array([states[c][1] for c in commodities])[idx]
+    volatility = np.array([states[c][2] for c in commodities])[idx]
+    prices = {c: _fetch_latest_price(c) for c in commodities}
+    current_price = df["commodity"].map(prices).to_numpy(dtype=float)
+
+    with metrics.timer("observe_rules"):
+        signal, reason = decide_exit_signals(
+            forecasts, seasonal, volatility,
+            current_price=current_price,
+            min_price=df["min_price"].to_numpy(dtype=float)
+        )
+    df["signal"] = SIGNALS[signal]
+    df["reason"] = np.array(REASONS)[reason]
+
+    changed = (df["signal"] != df["current_signal"]).to_numpy()
+    selling = (df["signal"] == "SELL").to_numpy()
+
+    # ---------- APPLY SIGNALS ----------
+    df.loc[changed, "current_signal"] = df.loc[changed, "signal"]
+    df.loc[changed, "last_notified_signal"] = df.loc[changed, "signal"]
+
+    # ---------- SELL → SETTLE ----------
+    if selling.any():
+        settlement = settle_commitments(df[selling], current_price[selling])
+
+        for column, values in settlement.items():
+            df.loc[selling, column] = values
+
+    # ---------- NOTIFY ON SIGNAL CHANGE ----------
+    # Queued, not sent inline: a slow gateway must not hold up settlement
+    for row in df[changed].itertuples():
+        message = (
+            f"{row.signal} ALERT – {row.commodity}\n\n"
+            f"Reason: {row.reason}\n\n"
+            f"Advisory only. Final decision is yours."
+        )
+
+        notifications.enqueue(
+            to_number=row.user_id,
+            message=message,
+            key=(row.commit_id, row.signal)
+        )
+
+    # ✅ SINGLE WRITE — one transaction for every touched row
+    with metrics.timer("observe_write"):
+        update_commitments(df[changed | selling], UPDATE_FIELDS)
+
+
+if __name__ == "__main__":
+    try:
+        observe_commitments()
+        notifications.drain()
+    finally:
+        metrics.dump("observer")
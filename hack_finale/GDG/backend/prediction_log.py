@@ -0,0 +1,200 @@
+"""
+Buffered prediction history log.
+
+log() only puts the row on an in-memory queue; a background thread per
+process writes rows in batches, when BATCH_SIZE rows are waiting or
+FLUSH_SECONDS after the first of them arrived.
+
+Files:
+
+    logs/prediction_history.csv                  current day
+    logs/prediction_history-YYYY-MM-DD.csv.gz    earlier days
+
+Several server workers append to the same file. Each batch is written
+with a single append while holding an flock on logs/prediction_history.lock,
+which also serialises the daily rotation: the first writer of a new day
+renames the current file and compresses it.
+
+load_history() reads the compressed days and the current file back into
+one DataFrame.
+"""
+
+import io
+import os
+import time
+import csv
+import glob
+import gzip
+import queue
+import shutil
+import atexit
+import threading
+import pandas as pd
+from datetime import date
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:   # Windows: single-process use only
+    fcntl = None
+
+LOG_DIR = "logs"
+LOG_FILE = os.path.join(LOG_DIR, "prediction_history.csv")
+LOCK_FILE = os.path.join(LOG_DIR, "prediction_history.lock")
+
+BATCH_SIZE = 100
+FLUSH_SECONDS = 2.0
+
+
+def archive_path(day):
+    return os.path.join(LOG_DIR, f"prediction_history-{day.isoformat()}.csv.gz")
+
+
+@contextmanager
+def _file_lock():
+    os.makedirs(LOG_DIR, exist_ok=True)
+    with open(LOCK_FILE, "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+# ---------------- ROTATION ----------------
+
+def _rotate_if_stale(today):
+    """Move a previous day's LOG_FILE to its .csv.gz archive. Call under the lock."""
+    if not os.path.exists(LOG_FILE):
+        return
+
+    day = date.fromtimestamp(os.path.getmtime(LOG_FILE))
+    if day >= today:
+        return
+
+    rotated = f"{LOG_FILE}.{day.isoformat()}"
+    os.replace(LOG_FILE, rotated)
+
+    target = archive_path(day)
+    append = os.path.exists(target)
+
+    # Appending adds a second gzip member, which readers handle transparently;
+    # skip the header so the archive stays a single CSV.
+    with open(rotated, "rb") as src, gzip.open(target, "ab") as dst:
+        if append:
+            src.readline()
+        shutil.copyfileobj(src, dst)
+
+    os.remove(rotated)
+
+
+# ---------------- WRITER ----------------
+
+def write_rows(rows):
+    """Append rows (dicts with the same keys) to LOG_FILE in one write."""
+    with _file_lock():
+        _rotate_if_stale(date.today())
+
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=rows[0].keys())
+
+        if not os.path.exists(LOG_FILE) or os.path.getsize(LOG_FILE) == 0:
+            writer.writeheader()
+        writer.writerows(rows)
+
+        with open(LOG_FILE, "a", newline="", encoding="utf-8") as f:
+            f.write(buf.getvalue())
+
+
+class PredictionLogger:
+
+    def __init__(self, sink=write_rows, batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Threads do not survive fork(); start one per worker process
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid():
+                self.queue = queue.Queue()
+                self._thread = threading.Thread(
+                    target=self._run, name="prediction-log", daemon=True
+                )
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def log(self, row):
+        """Queue one prediction record (dict)."""
+        self._ensure_started()
+        self.queue.put(row)
+
+    def flush(self):
+        """Block until every queued record is written."""
+        if self._thread is not None and self._pid == os.getpid():
+            self.queue.join()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+
+            try:
+                while len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                pass
+
+            try:
+                self.sink(batch)
+            except Exception as e:
+                print(f"❌ Failed to write {len(batch)} prediction log row(s): {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+
+prediction_logger = PredictionLogger()
+atexit.register(prediction_logger.flush)
+
+
+# ---------------- READING ----------------
+
+def load_history(start=None, end=None):
+    """
+    Every logged prediction as a DataFrame, oldest first.
+    start / end (YYYY-MM-DD) limit which daily archives are read.
+    """
+    paths = []
+    for path in sorted(glob.glob(os.path.join(LOG_DIR, "prediction_history-*.csv.gz"))):
+        day = os.path.basename(path)[len("prediction_history-"):-len(".csv.gz")]
+        if (start is None or day >= start) and (end is None or day <= end):
+            paths.append(path)
+
+    if os.path.exists(LOG_FILE):
+        paths.append(LOG_FILE)
+
+    if not paths:
+        return pd.DataFrame()
+
+    df = pd.concat([pd.read_csv(p) for p in paths], ignore_index=True)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
+
+    if start is not None:
+        df = df[df["timestamp"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["timestamp"] < pd.Timestamp(end) + pd.Timedelta(days=1)]
+
+    return df.sort_values("timestamp", kind="stable").reset_index(drop=True)
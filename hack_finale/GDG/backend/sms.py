@@ -1,35 +1,93 @@
-USE_REAL_SMS = True   # 🔴 KEEP False FOR EXAMS
-
-from twilio.rest import Client
-
-ACCOUNT_SID = "ACbba994648a70335c12a592a499f3176e"
-AUTH_TOKEN = "91911460b55381b12bc56c4f7b2ced94"
-FROM_NUMBER = "+18782187391"  # Twilio SMS number
-
-client = Client(ACCOUNT_SID, AUTH_TOKEN)
-
-
-def send_sms(to_number, message):
-    to_number = str(to_number)
-
-    if not to_number.startswith("+"):
-        print(f"❌ Invalid phone format: {to_number}")
-        return None
-
-    if not USE_REAL_SMS:
-        print("📩 SMS MOCK MODE")
-        print("To:", to_number)
-        print("Message:\n", message)
-        return "mock_sid"
-
-    try:
-        msg = client.messages.create(
-            body=message,
-            from_=FROM_NUMBER,
-            to=to_number
-        )
-        return msg.sid
-
-    except Exception as e:
-        print("❌ SMS sending failed:", e)
-        return None
+import os
+import uuid
+import requests
+
+USE_REAL_SMS = True   # 🔴 KEEP False FOR EXAMS
+
+ACCOUNT_SID = "ACbba994648a70335c12a592a499f3176e"
+AUTH_TOKEN = "91911460b55381b12bc56c4f7b2ced94"
+FROM_NUMBER = "+18782187391"  # Twilio SMS number
+
+# "twilio", "mock" or "http" (local stand-in, see backend/sms_gateway.py)
+TRANSPORT = os.environ.get("HARVESTHUB_SMS_TRANSPORT", "twilio" if USE_REAL_SMS else "mock")
+GATEWAY_URL = os.environ.get("HARVESTHUB_SMS_GATEWAY_URL", "http://127.0.0.1:8025/sms")
+
+
+# ---------------- TRANSPORTS ----------------
+# send() returns a message id and raises on failure so callers can retry.
+
+class MockTransport:
+
+    def send(self, to_number, message):
+        print("📩 SMS MOCK MODE")
+        print("To:", to_number)
+        print("Message:\n", message)
+        return "mock_sid"
+
+
+class TwilioTransport:
+
+    def __init__(self):
+        self._client = None
+
+    def send(self, to_number, message):
+        # Built on first use, not at import time
+        if self._client is None:
+            from twilio.rest import Client
+            self._client = Client(ACCOUNT_SID, AUTH_TOKEN)
+
+        msg = self._client.messages.create(
+            body=message,
+            from_=FROM_NUMBER,
+            to=to_number
+        )
+        return msg.sid
+
+
+class HttpTransport:
+
+    def __init__(self, url=GATEWAY_URL):
+        self.url = url
+        self.session = requests.Session()
+
+    def send(self, to_number, message):
+        response = self.session.post(
+            self.url,
+            json={"to": to_number, "from": FROM_NUMBER, "body": message},
+            timeout=10
+        )
+        response.raise_for_status()
+        return response.json().get("sid") or str(uuid.uuid4())
+
+
+_transports = {}
+
+
+def get_transport(name=None):
+    name = name or TRANSPORT
+    if name not in _transports:
+        _transports[name] = {
+            "mock": MockTransport,
+            "twilio": TwilioTransport,
+            "http": HttpTransport
+        }[name]()
+    return _transports[name]
+
+
+def valid_number(to_number):
+    return str(to_number).startswith("+")
+
+
+def send_sms(to_number, message):
+    to_number = str(to_number)
+
+    if not valid_number(to_number):
+        print(f"❌ Invalid phone format: {to_number}")
+        return None
+
+    try:
+        return get_transport().send(to_number, message)
+
+    except Exception as e:
+        print("❌ SMS sending failed:", e)
+        return None
@@ -0,0 +1,81 @@
+"""
+Local HTTP stand-in for the SMS gateway, for testing without Twilio.
+
+    python -m backend.sms_gateway [port]
+    HARVESTHUB_SMS_TRANSPORT=http python -m backend.observer
+
+POST /sms {"to", "from", "body"}  -> {"sid": "..."}
+GET  /sms                         -> every message received so far
+
+Set HARVESTHUB_SMS_GATEWAY_FAIL_RATE (0..1) to make a share of the
+requests fail with 503, which exercises the retry path.
+"""
+
+import os
+import sys
+import json
+import uuid
+import random
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8025
+FAIL_RATE = float(os.environ.get("HARVESTHUB_SMS_GATEWAY_FAIL_RATE", 0))
+
+_messages = []
+_lock = threading.Lock()
+
+
+class GatewayHandler(BaseHTTPRequestHandler):
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path != "/sms":
+            return self._reply(404, {"error": "not found"})
+
+        if random.random() < FAIL_RATE:
+            return self._reply(503, {"error": "simulated gateway failure"})
+
+        length = int(self.headers.get("Content-Length", 0))
+        data = json.loads(self.rfile.read(length) or b"{}")
+
+        message = {
+            "sid": "SM" + uuid.uuid4().hex[:16],
+            "to": data.get("to"),
+            "from": data.get("from"),
+            "body": data.get("body"),
+            "received_at": datetime.now().isoformat()
+        }
+        with _lock:
+            _messages.append(message)
+
+        print(f"📨 {message['to']}: {str(message['body']).splitlines()[0]}")
+        self._reply(201, {"sid": message["sid"]})
+
+    def do_GET(self):
+        if self.path != "/sms":
+            return self._reply(404, {"error": "not found"})
+
+        with _lock:
+            self._reply(200, {"count": len(_messages), "messages": _messages})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port=DEFAULT_PORT):
+    server = ThreadingHTTPServer(("127.0.0.1", port), GatewayHandler)
+    print(f"📡 Mock SMS gateway on http://127.0.0.1:{port}/sms")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    serve(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT)
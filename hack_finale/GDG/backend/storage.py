@@ -0,0 +1,205 @@
+"""
+Columnar on-disk store for the agriculture dataset.
+
+Layout (one directory per commodity, append-only part files):
+
+    data/store/
+        _VERSION
+        Rice/part-00000.arrow
+        Rice/part-00001.arrow
+        ...
+
+Parts are Arrow IPC (Feather v2) files written uncompressed so they can be
+memory-mapped. Appends write a new part and touch _VERSION; `compact`
+folds the parts of a commodity back into one file.
+
+The Excel workbook is kept as an import/export format:
+
+    python -m backend.storage import   [xlsx]
+    python -m backend.storage export   [xlsx]
+    python -m backend.storage compact
+"""
+
+import os
+import sys
+import glob
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.compute as pc
+
+EXCEL_FILE = "data/Agriculture_Dataset_2020_2026.xlsx"
+STORE_DIR = "data/store"
+VERSION_FILE = os.path.join(STORE_DIR, "_VERSION")
+
+
+# ---------------- HELPERS ----------------
+
+def _commodity_dir(commodity):
+    return os.path.join(STORE_DIR, commodity)
+
+
+def _parts(commodity):
+    return sorted(glob.glob(os.path.join(_commodity_dir(commodity), "part-*.arrow")))
+
+
+def _next_part_path(commodity):
+    parts = _parts(commodity)
+    seq = int(os.path.basename(parts[-1])[5:10]) + 1 if parts else 0
+    return os.path.join(_commodity_dir(commodity), f"part-{seq:05d}.arrow")
+
+
+def _write_table(table, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+
+    with pa.OSFile(tmp, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    os.replace(tmp, path)
+
+
+def _read_part(path):
+    with pa.memory_map(path, "r") as source:
+        return ipc.open_file(source).read_all()
+
+
+def _touch_version():
+    os.makedirs(STORE_DIR, exist_ok=True)
+    tmp = VERSION_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(pd.Timestamp.now().isoformat())
+    os.replace(tmp, VERSION_FILE)
+
+
+def _normalize(df):
+    df = df.copy()
+    df.columns = df.columns.str.strip()
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+
+# ---------------- STORE API ----------------
+
+def has_store():
+    return os.path.exists(VERSION_FILE)
+
+
+def store_version():
+    return os.path.getmtime(VERSION_FILE)
+
+
+def commodities():
+    if not os.path.isdir(STORE_DIR):
+        return []
+    return sorted(
+        name for name in os.listdir(STORE_DIR)
+        if os.path.isdir(_commodity_dir(name))
+    )
+
+
+def read_commodity(commodity):
+    tables = [_read_part(p) for p in _parts(commodity)]
+    if not tables:
+        return pd.DataFrame()
+    return pa.concat_tables(tables).to_pandas().drop_duplicates()
+
+
+def read_frames():
+    """{commodity: date-sorted frame} for every commodity in the store."""
+    return {
+        commodity: read_commodity(commodity)
+        .sort_values("Date", kind="stable")
+        .reset_index(drop=True)
+        for commodity in commodities()
+    }
+
+
+def append_rows(df):
+    """Append new rows (any commodities) as one new part per commodity."""
+    df = _normalize(df)
+
+    for commodity, cdf in df.groupby("Commodity", sort=False):
+        table = pa.Table.from_pandas(
+            cdf.sort_values("Date", kind="stable"), preserve_index=False
+        )
+
+        parts = _parts(commodity)
+        if parts:
+            schema = _read_part(parts[0]).schema
+            table = table.select(schema.names).cast(schema)
+
+        _write_table(table, _next_part_path(commodity))
+
+    _touch_version()
+
+
+def write_frame(df):
+    """Replace the whole store with the rows of `df`."""
+    df = _normalize(df)
+
+    for commodity in commodities():
+        for path in _parts(commodity):
+            os.remove(path)
+
+    for commodity, cdf in df.groupby("Commodity", sort=False):
+        table = pa.Table.from_pandas(
+            cdf.sort_values("Date", kind="stable"), preserve_index=False
+        )
+        _write_table(table, os.path.join(_commodity_dir(commodity), "part-00000.arrow"))
+
+    _touch_version()
+
+
+def compact():
+    """Fold every commodity's parts into a single part file."""
+    for commodity in commodities():
+        parts = _parts(commodity)
+        if len(parts) < 2:
+            continue
+
+        table = pa.concat_tables([_read_part(p) for p in parts])
+        table = table.take(
+            pc.sort_indices(table, sort_keys=[("Date", "ascending")])
+        )
+
+        # Overwrite the first part, then drop the rest. A crash in between
+        # leaves duplicate rows, which read_commodity() discards.
+        _write_table(table, parts[0])
+        for path in parts[1:]:
+            os.remove(path)
+
+    _touch_version()
+
+
+# ---------------- EXCEL IMPORT / EXPORT ----------------
+
+def import_excel(path=EXCEL_FILE):
+    write_frame(pd.read_excel(path))
+
+
+def export_excel(path=EXCEL_FILE):
+    frames = read_frames()
+    df = pd.concat(frames.values(), ignore_index=True)
+    df = df.sort_values(["Date", "Commodity"], kind="stable")
+    df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
+    df.to_excel(path, index=False)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    target = sys.argv[2] if len(sys.argv) > 2 else EXCEL_FILE
+
+    if command == "import":
+        import_excel(target)
+        print(f"✅ Imported {target} into {STORE_DIR}")
+    elif command == "export":
+        export_excel(target)
+        print(f"✅ Exported {STORE_DIR} to {target}")
+    elif command == "compact":
+        compact()
+        print(f"✅ Compacted {STORE_DIR}")
+    else:
+        print("Usage: python -m backend.storage [import|export|compact] [xlsx]")
+        sys.exit(1)
@@ -0,0 +1,277 @@
+"""
+Walk-forward backtesting.
+
+The history of each commodity is cut into folds. For a fold starting at
+row t, a fresh model is trained on rows before t (all of them, or the
+last `train_window`), and every day in [t-1, t-1+retrain_every) is used as
+a forecast origin: the same recursive forecast that get_market_intelligence
+serves is run from that day's features and compared with the prices that
+actually followed.
+
+    python backtest.py [--commodities ...] [--retrain-every 30]
+                       [--min-train 730] [--horizon 7] [--workers N]
+
+Feature matrices are built once per commodity and data version, and handed
+to each worker process once (not once per fold). Folds of all commodities
+run in one process pool.
+
+When the global model is the one serving (models/global.pkl), folds are
+cut at shared dates instead: each fits one GlobalPriceModel on the stacked
+rows of every series dated before the cutoff and forecasts all of them.
+"""
+
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from feature_engineering import create_features, FEATURES
+from backend import dataset
+from backend.forecasting import recursive_forecast, WINDOW
+from backend.global_model import GlobalPriceModel
+from backend.model_registry import has_global_model
+from train import fit_model, split_cores, MODEL_PARAMS, TARGET
+
+RETRAIN_EVERY = 30
+MIN_TRAIN_DAYS = 730
+HORIZON = 7
+
+
+# ---------------- FEATURE MATRICES ----------------
+
+# (commodity, data_version) -> {"X", "y", "dates"}
+_matrix_cache = {}
+
+# Set in each worker by _init_worker
+_worker_matrices = {}
+
+
+def feature_matrix(commodity):
+    """Feature matrix, target and dates of one commodity, built once per data version."""
+    key = (commodity, dataset.data_version())
+
+    if key not in _matrix_cache:
+        cdf = create_features(dataset.get_commodity_frame(commodity).copy())
+        _matrix_cache[key] = {
+            "X": cdf[FEATURES].to_numpy(dtype=float),
+            "y": cdf[TARGET].to_numpy(dtype=float),
+            "dates": cdf["Date"].to_numpy()
+        }
+
+    return _matrix_cache[key]
+
+
+def _init_worker(matrices):
+    _worker_matrices.update(matrices)
+
+
+# ---------------- FOLDS ----------------
+
+def fold_starts(n_rows, min_train=MIN_TRAIN_DAYS, retrain_every=RETRAIN_EVERY, horizon=HORIZON,
+                recent=None):
+    """
+    First row of every fold; the last fold still has a full horizon of actuals.
+    recent=N keeps only the folds whose origins fall in the last N scorable rows.
+    """
+    first = max(min_train, WINDOW)
+    if recent:
+        first = max(first, n_rows - horizon - recent)
+    return list(range(first, n_rows - horizon, retrain_every))
+
+
+def run_fold(commodity, start, retrain_every=RETRAIN_EVERY, horizon=HORIZON,
+             train_window=None, threads=1):
+    """
+    Train on rows before `start` and forecast from every origin in the fold.
+    Returns (commodity, forecasts, actuals, last_prices, origins), one row
+    per origin; origins are row indexes into the feature matrix.
+    """
+    m = _worker_matrices.get(commodity) or feature_matrix(commodity)
+    X, y = m["X"], m["y"]
+
+    lo = 0 if train_window is None else max(0, start - train_window)
+    model = fit_model(X[lo:start], y[lo:start], threads)
+
+    # Origin o knows rows up to and including o and forecasts o+1 .. o+horizon
+    origins = np.arange(start - 1, min(start - 1 + retrain_every, len(y) - horizon))
+
+    windows = y[origins[:, None] + np.arange(-WINDOW + 1, 1)]
+    forecasts = recursive_forecast(model, X[origins], windows, horizon)
+    actuals = y[origins[:, None] + np.arange(1, horizon + 1)]
+
+    return commodity, forecasts, actuals, y[origins], origins
+
+
+# ---------------- GLOBAL MODEL FOLDS ----------------
+
+def global_cutoffs(matrices, min_train=MIN_TRAIN_DAYS, retrain_every=RETRAIN_EVERY, horizon=HORIZON,
+                   recent=None):
+    """(cutoff, next cutoff or None) dates of the global folds, on the union of the series' dates."""
+    axis = np.unique(np.concatenate([m["dates"] for m in matrices.values()]))
+    return [
+        (axis[s], axis[s + retrain_every] if s + retrain_every < len(axis) else None)
+        for s in fold_starts(len(axis), min_train, retrain_every, horizon, recent)
+    ]
+
+
+def run_global_fold(cutoff, end, keys, train_keys, horizon=HORIZON, train_window=None, threads=1):
+    """
+    Train one GlobalPriceModel on the rows of `train_keys` dated before
+    `cutoff` and forecast every origin of `keys` up to `end`, in one
+    recursive_forecast call. Returns a list of run_fold results, one per
+    series that has origins in the fold.
+    """
+    matrices = {k: _worker_matrices.get(k) or feature_matrix(k) for k in {*keys, *train_keys}}
+    starts = {k: int(np.searchsorted(m["dates"], cutoff)) for k, m in matrices.items()}
+
+    X, y, series = [], [], []
+    for k in train_keys:
+        m, start = matrices[k], starts[k]
+        lo = 0 if train_window is None else max(0, start - train_window)
+        X.append(m["X"][lo:start])
+        y.append(m["y"][lo:start])
+        series.append(np.full(start - lo, k))
+
+    model = GlobalPriceModel(**MODEL_PARAMS).fit(
+        np.concatenate(X), np.concatenate(y), np.concatenate(series), n_jobs=threads
+    )
+
+    # Same origins as run_fold: from the day before the cutoff up to the next fold
+    origins = {}
+    for k in keys:
+        m, start = matrices[k], starts[k]
+        stop = len(m["y"]) - horizon
+        if end is not None:
+            stop = min(stop, int(np.searchsorted(m["dates"], end)) - 1)
+
+        o = np.arange(max(start - 1, WINDOW - 1), stop)
+        if len(o):
+            origins[k] = o
+
+    if not origins:
+        return []
+
+    X0 = np.vstack([matrices[k]["X"][o] for k, o in origins.items()])
+    windows = np.vstack([matrices[k]["y"][o[:, None] + np.arange(-WINDOW + 1, 1)] for k, o in origins.items()])
+    series = np.concatenate([np.full(len(o), k) for k, o in origins.items()])
+    forecasts = recursive_forecast(model, X0, windows, horizon, keys=series)
+
+    results, row = [], 0
+    for k, o in origins.items():
+        y = matrices[k]["y"]
+        actuals = y[o[:, None] + np.arange(1, horizon + 1)]
+        results.append((k, forecasts[row:row + len(o)], actuals, y[o], o))
+        row += len(o)
+
+    return results
+
+
+# ---------------- METRICS ----------------
+
+def score(forecasts, actuals, last_prices):
+    """MAPE / RMSE / directional accuracy overall and per horizon day."""
+    err = forecasts - actuals
+    ape = np.abs(err) / np.abs(actuals) * 100
+    hit = np.sign(forecasts - last_prices[:, None]) == np.sign(actuals - last_prices[:, None])
+
+    return {
+        "mape_pct": round(float(ape.mean()), 2),
+        "rmse": round(float(np.sqrt((err ** 2).mean())), 2),
+        "directional_accuracy_pct": round(float(hit.mean() * 100), 2),
+        "mape_by_day_pct": [round(float(v), 2) for v in ape.mean(axis=0)],
+        "rmse_by_day": [round(float(v), 2) for v in np.sqrt((err ** 2).mean(axis=0))],
+        "test_samples": int(len(forecasts))
+    }
+
+
+# ---------------- ENGINE ----------------
+
+def run_folds(commodities=None, retrain_every=RETRAIN_EVERY, min_train=MIN_TRAIN_DAYS,
+              horizon=HORIZON, train_window=None, workers=None, recent=None, global_model=None):
+    """
+    Run every fold of every commodity; returns {commodity: [run_fold result, ...]}.
+    global_model=True fits GlobalPriceModel folds instead of one model per
+    series (default: whenever models/global.pkl is serving).
+    """
+    commodities = commodities or dataset.series()
+    if global_model is None:
+        global_model = has_global_model()
+
+    if global_model:
+        # The global model is fit on every series, whichever ones are scored
+        train_keys = dataset.series()
+        matrices = {c: feature_matrix(c) for c in {*commodities, *train_keys}}
+        cutoffs = global_cutoffs({c: matrices[c] for c in commodities},
+                                 min_train, retrain_every, horizon, recent)
+        tasks = [
+            (run_global_fold, (cutoff, end, commodities, train_keys, horizon, train_window))
+            for cutoff, end in cutoffs
+        ]
+    else:
+        matrices = {c: feature_matrix(c) for c in commodities}
+        tasks = [
+            (run_fold, (c, s, retrain_every, horizon, train_window))
+            for c in commodities
+            for s in fold_starts(len(matrices[c]["y"]), min_train, retrain_every, horizon, recent)
+        ]
+
+    workers, threads = split_cores(max(len(tasks), 1), workers)
+    print(f"🔁 {len(tasks)} {'global ' if global_model else ''}folds over {len(commodities)} commodities, "
+          f"{workers} worker(s) x {threads} thread(s)")
+
+    parts = {c: [] for c in commodities}
+
+    def collect(result):
+        for part in (result if global_model else [result]):
+            parts[part[0]].append(part)
+
+    if workers == 1:
+        for fn, args in tasks:
+            collect(fn(*args, threads))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(matrices,)) as pool:
+            futures = [pool.submit(fn, *args, threads) for fn, args in tasks]
+            for future in futures:
+                collect(future.result())
+
+    return parts
+
+
+def walk_forward(commodities=None, retrain_every=RETRAIN_EVERY, min_train=MIN_TRAIN_DAYS,
+                 horizon=HORIZON, train_window=None, workers=None, global_model=None):
+    """
+    Backtest every commodity; returns {commodity: metrics}.
+    Commodities without enough history for one fold get an "error" entry.
+    """
+    start_time = time.perf_counter()
+    parts = run_folds(commodities, retrain_every, min_train, horizon, train_window, workers,
+                      global_model=global_model)
+
+    results = {}
+    for c, folds in parts.items():
+        if not folds:
+            results[c] = {"error": "Not enough data for a walk-forward fold"}
+            continue
+
+        forecasts, actuals, last = (np.concatenate(a) for a in list(zip(*folds))[1:4])
+        results[c] = {**score(forecasts, actuals, last), "folds": len(folds)}
+
+    print(f"⏱ backtest: {time.perf_counter() - start_time:.1f}s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the price models")
+    parser.add_argument("--commodities", nargs="+", help="subset to backtest (default: all)")
+    parser.add_argument("--retrain-every", type=int, default=RETRAIN_EVERY, help="days between refits")
+    parser.add_argument("--min-train", type=int, default=MIN_TRAIN_DAYS, help="rows in the first training set")
+    parser.add_argument("--train-window", type=int, help="train on the last N rows only (default: expanding)")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="forecast days scored per origin")
+    parser.add_argument("--workers", type=int, help="processes (default: one per core)")
+    args = parser.parse_args()
+
+    results = walk_forward(args.commodities, args.retrain_every, args.min_train,
+                           args.horizon, args.train_window, args.workers)
+
+    for commodity, metrics in results.items():
+        print(commodity, metrics)
@@ -0,0 +1,298 @@
+"""
+Benchmark suite.
+
+    python -m benchmarks.run [--years 6] [--commodities 4] [--markets 0] [--global]
+                             [--commitments 10000] [--clients 8] [--requests 2000]
+                             [--out results.json]
+
+Everything runs in a scratch workspace (a temp directory unless
+--workspace is given) holding a synthetic dataset, so the real data,
+models and logs are never touched. Steps, in order:
+
+    train               train.train() on the synthetic store (train_global with --global)
+    intelligence        first call, cold (cache miss) and warm latency
+    api                 /api/predict throughput with concurrent clients
+    observe             observe_commitments, also scaled to 10k commitments
+    daily_update        one append (sources stubbed, no network) + retrain
+
+Results go to benchmarks/results/<timestamp>.json by default, together
+with the parameters, git revision and machine, so runs of different
+versions can be diffed.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import platform
+import argparse
+import tempfile
+import threading
+import subprocess
+import numpy as np
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)   # the run chdirs into its workspace
+
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+
+
+def _percentiles(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {
+        "count": int(len(ms)),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "max_ms": round(float(ms.max()), 3)
+    }
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    value = fn(*args, **kwargs)
+    return value, time.perf_counter() - start
+
+
+class _NullTransport:
+    def send(self, to_number, message):
+        return "bench"
+
+
+# ---------------- STEPS ----------------
+
+def bench_train(workers, global_model=False):
+    import train
+
+    if global_model:
+        metadata, seconds = _timed(train.train_global)
+        return {
+            "seconds": round(seconds, 3),
+            "models": 1,
+            "series": len(metadata["series"]),
+            "fit_seconds": metadata["fit_seconds"],
+            "model_bytes": os.path.getsize(os.path.join("models", "global.pkl"))
+        }
+
+    models, seconds = _timed(train.train, workers=workers)
+    return {
+        "seconds": round(seconds, 3),
+        "models": len(models),
+        "fit_seconds": {c: m["fit_seconds"] for c, m in models.items()}
+    }
+
+
+def bench_intelligence(commodities, warm_calls):
+    from backend import forecast_cache
+    from backend.intelligence import get_market_intelligence, get_market_intelligence_batch
+
+    # Very first call: dataset snapshot, feature state and model load
+    _, first = _timed(get_market_intelligence, commodities[0])
+
+    cold = []
+    for commodity in commodities:
+        forecast_cache.invalidate(commodity)
+        cold.append(_timed(get_market_intelligence, commodity)[1])
+
+    warm = [
+        _timed(get_market_intelligence, random.choice(commodities))[1]
+        for _ in range(warm_calls)
+    ]
+
+    forecast_cache.invalidate()
+    _, batch_cold = _timed(get_market_intelligence_batch, commodities)
+
+    return {
+        "first_call_ms": round(first * 1000, 3),
+        "cold": _percentiles(cold),
+        "warm": _percentiles(warm),
+        "batch_cold_ms": round(batch_cold * 1000, 3)
+    }
+
+
+def bench_api(commodities, clients, total_requests):
+    import logging
+    import requests
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/api/predict"
+
+    def client(n):
+        session = requests.Session()
+        latencies, errors = [], 0
+        for _ in range(n):
+            start = time.perf_counter()
+            response = session.post(url, json={"commodity": random.choice(commodities)})
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+        return latencies, errors
+
+    per_client = [total_requests // clients] * clients
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(client, per_client))
+    elapsed = time.perf_counter() - start
+
+    server.shutdown()
+
+    latencies = [s for lat, _ in results for s in lat]
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": sum(e for _, e in results),
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "latency": _percentiles(latencies)
+    }
+
+
+def bench_observe(df, n_commitments):
+    from benchmarks.synthetic import generate_commitments
+    from backend.commitment_store import insert_commitments, active_commitments
+    from backend.notifications import notifications, TokenBucket
+    from backend.observer import observe_commitments
+
+    # Alerts go nowhere and are not rate limited
+    notifications.transport = _NullTransport()
+    notifications.bucket = TokenBucket(1e9, 1e9)
+
+    rows = generate_commitments(df, n_commitments)
+    _, insert_seconds = _timed(insert_commitments, rows)
+
+    _, seconds = _timed(observe_commitments)
+    notifications.drain()
+
+    return {
+        "commitments": n_commitments,
+        "insert_seconds": round(insert_seconds, 3),
+        "seconds": round(seconds, 3),
+        "seconds_per_10k": round(seconds * 10000 / n_commitments, 3),
+        "still_active": int(len(active_commitments()))
+    }
+
+
+def bench_daily_update():
+    import updater.daily_update as daily
+
+    def fetch_sources(date, live=True):
+        return {
+            "mandi_summary": {},
+            "news": {"Procurement_Season_Flag": 0, "Export_Ban_Flag": 0},
+            "weather": 0.0
+        }
+
+    daily.fetch_sources = fetch_sources
+
+    _, seconds = _timed(daily.daily_update, retrain_mode=None)
+    _, retrain_seconds = _timed(daily.retrain, None, "window")
+
+    return {
+        "seconds": round(seconds, 3),
+        "retrain_window_seconds": round(retrain_seconds, 3)
+    }
+
+
+# ---------------- DRIVER ----------------
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    from benchmarks.synthetic import generate_dataset
+    from backend import storage, dataset
+
+    random.seed(args.seed)
+    workspace = args.workspace or tempfile.mkdtemp(prefix="harvesthub-bench-")
+    os.makedirs(workspace, exist_ok=True)
+
+    # Every data/, models/ and logs/ path in the app is relative to the CWD
+    os.chdir(workspace)
+    print(f"📁 Workspace: {workspace}")
+
+    df = generate_dataset(args.years, args.commodities, markets=args.markets, seed=args.seed)
+    _, store_seconds = _timed(storage.write_frame, df)
+    commodities = dataset.series()
+    print(f"📦 {len(df)} rows, {len(commodities)} series ({store_seconds:.2f}s to write)")
+
+    results = {"dataset": {"rows": len(df), "store_write_seconds": round(store_seconds, 3)}}
+    steps = [
+        ("train", lambda: bench_train(args.workers, args.global_model)),
+        ("intelligence", lambda: bench_intelligence(commodities, args.warm_calls)),
+        ("api", lambda: bench_api(commodities, args.clients, args.requests)),
+        ("observe", lambda: bench_observe(df, args.commitments)),
+        ("daily_update", bench_daily_update)
+    ]
+
+    for name, step in steps:
+        if args.only and name not in args.only:
+            continue
+        print(f"⏱ {name}...")
+        results[name] = step()
+        print(f"   {results[name]}")
+
+    if not args.workspace and not args.keep:
+        os.chdir(REPO_DIR)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HarvestHub benchmark suite")
+    parser.add_argument("--years", type=float, default=6, help="years of daily history")
+    parser.add_argument("--commodities", type=int, default=4, help="number of commodities")
+    parser.add_argument("--markets", type=int, default=0, help="markets per commodity (0: no Market column)")
+    parser.add_argument("--global", dest="global_model", action="store_true", help="train one global model")
+    parser.add_argument("--commitments", type=int, default=10000, help="active commitments to observe")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent /api/predict clients")
+    parser.add_argument("--requests", type=int, default=2000, help="total /api/predict requests")
+    parser.add_argument("--warm-calls", type=int, default=1000, help="warm get_market_intelligence calls")
+    parser.add_argument("--workers", type=int, help="training processes")
+    parser.add_argument("--only", nargs="+", help="run only these steps")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workspace", help="directory to run in (kept afterwards)")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary workspace")
+    parser.add_argument("--out", help="results file (default: benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    out = os.path.abspath(args.out) if args.out else os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+
+    started = datetime.now()
+    results = run(args)
+
+    report = {
+        "started_at": started.isoformat(),
+        "git_revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("out", "workspace", "keep")},
+        "results": results
+    }
+
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"📝 Results written to {out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Synthetic data in the Agriculture_Dataset_2020_2026.xlsx schema.
+
+Prices follow a seasonal random walk around a per-commodity base price;
+the other columns move the way they do in the real workbook (MSP steps
+once a year, flags switch by season, arrivals peak after harvest). With
+markets > 0 a Market column is added and every commodity gets that many
+market series, each a noisy, offset copy of the commodity's price path.
+"""
+
+import uuid
+import numpy as np
+import pandas as pd
+from backend.dataset import SERIES_SEP
+
+BASE_COMMODITIES = ["Banana", "Coconut", "Rice", "Wheat"]
+
+COLUMNS = [
+    "Date", "Commodity", "MSP", "Procurement_Season_Flag", "Export_Ban_Flag",
+    "FCI_Stock_LMT", "Daily_Mandi_Price", "Daily_Arrivals_Tonnes",
+    "Rainfall_Deviation_Pct", "Festival_Season_Flag", "Fertilizer_Price_Index"
+]
+
+
+def commodity_names(n):
+    """The real commodities first, then Crop_05, Crop_06, ..."""
+    return (BASE_COMMODITIES + [f"Crop_{i:02d}" for i in range(len(BASE_COMMODITIES) + 1, n + 1)])[:n]
+
+
+def generate_dataset(years=6, commodities=4, end=None, markets=0, seed=42):
+    """
+    Daily rows for `commodities` commodities over `years` years, ending the
+    day before `end` (default: today) so daily_update has a day to append.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or pd.Timestamp.today().normalize()) - pd.Timedelta(days=1)
+    dates = pd.date_range(end=end, periods=int(years * 365), freq="D")
+    n = len(dates)
+
+    doy = dates.dayofyear.to_numpy()
+    month = dates.month.to_numpy()
+    year_index = (dates.year - dates.year[0]).to_numpy()
+
+    frames = []
+    for name in commodity_names(commodities):
+        base = rng.uniform(1200, 3800)
+        season = 0.06 * np.sin(2 * np.pi * (doy - rng.uniform(0, 365)) / 365)
+        walk = np.cumsum(rng.normal(0, 0.004, n))
+        price = base * (1 + season + walk - walk.mean())
+
+        has_msp = name in ("Rice", "Wheat") or rng.random() < 0.5
+        msp = (base * 0.8 * (1.05 ** year_index)).round() if has_msp else np.zeros(n)
+
+        arrivals = rng.uniform(500, 20000) * (1 + 0.4 * np.cos(2 * np.pi * (doy - 60) / 365))
+        arrivals *= rng.lognormal(0, 0.15, n)
+
+        frame = pd.DataFrame({
+            "Date": dates,
+            "Commodity": name,
+            "MSP": msp.astype(np.int64),
+            "Procurement_Season_Flag": np.isin(month, [4, 5, 10, 11]).astype(np.int64) if has_msp else 0,
+            "Export_Ban_Flag": (rng.random(n) < 0.02).cumsum() % 2,
+            "FCI_Stock_LMT": np.where(has_msp, 200 + 80 * np.sin(2 * np.pi * doy / 365), 0.0),
+            "Daily_Mandi_Price": price.round(2),
+            "Daily_Arrivals_Tonnes": arrivals.round(2),
+            "Rainfall_Deviation_Pct": np.where(np.isin(month, [6, 7, 8, 9]), rng.normal(0, 20, n), 0.0).round(2),
+            "Festival_Season_Flag": np.isin(month, [10, 11]).astype(np.int64),
+            "Fertilizer_Price_Index": (100 + 15 * year_index + rng.normal(0, 2, n)).round(2)
+        })
+
+        if not markets:
+            frames.append(frame)
+            continue
+
+        for m in range(1, markets + 1):
+            local = price * rng.uniform(0.9, 1.1) * (1 + np.cumsum(rng.normal(0, 0.002, n)))
+            frames.append(frame.assign(
+                Market=f"Market_{m:02d}",
+                Daily_Mandi_Price=local.round(2),
+                Daily_Arrivals_Tonnes=(arrivals / markets).round(2)
+            ))
+
+    columns = COLUMNS + ["Market"] if markets else COLUMNS
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values(["Date", "Commodity"], kind="stable").reset_index(drop=True)[columns]
+
+
+def generate_commitments(df, n, seed=42):
+    """n active commitments over the dataset's series, at their last price."""
+    rng = np.random.default_rng(seed)
+    key = df["Commodity"] + SERIES_SEP + df["Market"] if "Market" in df else df["Commodity"]
+    last = df.assign(Series=key).sort_values("Date").groupby("Series")["Daily_Mandi_Price"].last()
+
+    commodity = rng.choice(last.index.to_numpy(), size=n)
+    entry_price = last[commodity].to_numpy()
+
+    return [
+        {
+            "commit_id": uuid.uuid4().hex,
+            "user_id": f"+91{rng.integers(7000000000, 9999999999)}",
+            "commodity": c,
+            "entry_price": float(p),
+            "quantity": int(rng.integers(10, 500)),
+            "entry_date": pd.Timestamp.now().isoformat(),
+            "current_signal": "HOLD",
+            "status": "active",
+            "min_price": float(p * rng.uniform(0.9, 1.05)) if rng.random() < 0.5 else None
+        }
+        for c, p in zip(commodity, entry_price)
+    ]
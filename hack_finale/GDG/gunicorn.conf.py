@@ -0,0 +1,46 @@
+"""
+Gunicorn settings for the HarvestHub API.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden through the environment, e.g.
+
+    HARVESTHUB_WORKERS=8 HARVESTHUB_TIMEOUT=60 gunicorn -c gunicorn.conf.py wsgi:app
+
+Reloading:
+    kill -HUP <master pid>     re-read this file and replace the workers
+                               gracefully (in-flight requests finish)
+    kill -USR2 <master pid>    start a new master with new code, then
+                               kill -QUIT the old master once it is up
+"""
+
+import os
+import multiprocessing
+
+bind = os.environ.get("HARVESTHUB_BIND", "0.0.0.0:5000")
+
+# Workers / threads
+workers = int(os.environ.get("HARVESTHUB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("HARVESTHUB_THREADS", 2))
+worker_class = "gthread"
+
+# Load dataset and models once in the master, share them copy-on-write
+preload_app = True
+
+# One XGBoost thread per model: forecasts are tiny batches and several
+# workers each running a full OpenMP pool only contend for cores
+os.environ.setdefault("HARVESTHUB_MODEL_THREADS", "1")
+
+# Timeouts (seconds)
+timeout = int(os.environ.get("HARVESTHUB_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("HARVESTHUB_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("HARVESTHUB_KEEPALIVE", 5))
+
+# Recycle workers now and then so memory growth stays bounded
+max_requests = int(os.environ.get("HARVESTHUB_MAX_REQUESTS", 5000))
+max_requests_jitter = int(os.environ.get("HARVESTHUB_MAX_REQUESTS_JITTER", 500))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("HARVESTHUB_LOG_LEVEL", "info")
+
@@ -0,0 +1,244 @@
+"""
+Exit-strategy simulator.
+
+Replays the historical dataset as if the observer had run every day:
+synthetic commitments are opened on random days, the exit rules are
+evaluated on each following day with that day's forecast, seasonal
+outlook and volatility, and a commitment is settled at the day's price on
+its first SELL (or at the end of the holding limit). Results are reported
+per rule parameterization.
+
+    python simulate_exits.py [--commitments 5000] [--max-hold 90]
+                             [--min-upside 1 2 3 5] [--sweep-switches]
+                             [--floor-pct 0] [--walk-forward] [--out results.json]
+
+The exit rules only depend on the day, not on the commitment (apart from
+the min_price floor), so the signal for every (parameter set, commodity,
+day) is computed in one decide_exit_signals call. Each commitment then
+exits on the first day on or after its entry where that signal is SELL
+and the price is not below its floor — the same outcome as replaying the
+observer day by day.
+
+Forecasts come from the saved models by default, which have seen the whole
+history; --walk-forward uses backtest.py's out-of-sample forecasts instead.
+"""
+
+import json
+import time
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from backend import dataset
+from backend.model_registry import get_model
+from backend.forecasting import recursive_forecast, WINDOW
+from backend.exit_engine import decide_exit_signals, SEASONAL_CODES, SELL, DEFAULT_MIN_UPSIDE_PCT
+from backend.commitments import settle_commitments, PLATFORM_FEE_RATE
+from backend.intelligence import seasonal_outlook, LOW_VOLATILITY, HIGH_VOLATILITY
+from backtest import feature_matrix, run_folds, HORIZON
+
+N_COMMITMENTS = 5000
+MAX_HOLD_DAYS = 90
+QUANTITY_RANGE = (10, 500)
+SEED = 42
+
+
+# ---------------- MARKET HISTORY ----------------
+
+def market_history(commodity, walk_forward=False):
+    """
+    Per-day arrays for one commodity, over the days that have a forecast:
+    prices, (days, HORIZON) forecasts, seasonal and volatility codes.
+    """
+    m = feature_matrix(commodity)
+    X, y, dates = m["X"], m["y"], pd.DatetimeIndex(m["dates"])
+
+    if walk_forward:
+        folds = run_folds([commodity])[commodity]
+        origins = np.concatenate([f[4] for f in folds])
+        forecasts = np.concatenate([f[1] for f in folds])
+    else:
+        origins = np.arange(WINDOW - 1, len(y))
+        windows = y[origins[:, None] + np.arange(-WINDOW + 1, 1)]
+        forecasts = recursive_forecast(
+            get_model(commodity), X[origins], windows, HORIZON,
+            keys=np.full(len(origins), commodity)
+        )
+
+    month_codes = {
+        month: SEASONAL_CODES[seasonal_outlook(pd.Timestamp(2000, month, 1))["trend"]]
+        for month in range(1, 13)
+    }
+
+    vol = pd.Series(y).rolling(14).std().to_numpy()[origins]
+    volatility = np.select([vol < LOW_VOLATILITY, vol < HIGH_VOLATILITY], [0, 1], default=2)
+
+    return {
+        "dates": dates[origins],
+        "prices": y[origins],
+        "forecasts": forecasts,
+        "seasonal": dates[origins].month.map(month_codes).to_numpy(),
+        "volatility": volatility
+    }
+
+
+# ---------------- PARAMETERS ----------------
+
+def parameter_grid(min_upside=(DEFAULT_MIN_UPSIDE_PCT,), sweep_switches=False):
+    """List of decide_exit_signals keyword sets."""
+    switches = [True, False] if sweep_switches else [True]
+    return [
+        {"min_upside_pct": u, "sell_on_bearish": b, "sell_on_high_volatility": v}
+        for u, b, v in itertools.product(min_upside, switches, switches)
+    ]
+
+
+def day_signals(history, params):
+    """(len(params), days) bool array: would the rules say SELL on that day?"""
+    n_days = len(history["prices"])
+    n_params = len(params)
+
+    def per_row(key):
+        return np.repeat([p[key] for p in params], n_days)
+
+    signal, _ = decide_exit_signals(
+        np.tile(history["forecasts"], (n_params, 1)),
+        np.tile(history["seasonal"], n_params),
+        np.tile(history["volatility"], n_params),
+        min_upside_pct=per_row("min_upside_pct"),
+        sell_on_bearish=per_row("sell_on_bearish"),
+        sell_on_high_volatility=per_row("sell_on_high_volatility")
+    )
+    return (signal == SELL).reshape(n_params, n_days)
+
+
+# ---------------- SIMULATION ----------------
+
+def synthetic_commitments(n_days, n, floor_pct=None, rng=None):
+    """Random entry days and quantities; floor_pct sets min_price relative to entry."""
+    rng = rng or np.random.default_rng(SEED)
+    return {
+        "entry": rng.integers(0, n_days - 1, size=n),
+        "quantity": rng.integers(*QUANTITY_RANGE, size=n).astype(float),
+        "floor_pct": floor_pct
+    }
+
+
+def simulate_commodity(history, params, commitments, max_hold=MAX_HOLD_DAYS):
+    """Exit day and settlement of every commitment under every parameter set."""
+    prices = history["prices"]
+    n_days = len(prices)
+    entry = commitments["entry"]
+
+    entry_price = prices[entry]
+    if commitments["floor_pct"] is None:
+        min_price = np.full(len(entry), -np.inf)
+    else:
+        min_price = entry_price * (1 + commitments["floor_pct"] / 100)
+
+    # (commitments, max_hold) day index, clipped to the end of the history
+    days = np.minimum(entry[:, None] + np.arange(max_hold), n_days - 1)
+    last_day = days[:, -1]
+    sellable_price = prices[days] >= min_price[:, None]
+
+    sells = day_signals(history, params)
+
+    results = []
+    for p, sell in enumerate(sells):
+        can_exit = sell[days] & sellable_price
+        hit = can_exit.any(axis=1)
+        exit_day = np.where(hit, days[np.arange(len(entry)), can_exit.argmax(axis=1)], last_day)
+
+        settlement = settle_commitments(
+            pd.DataFrame({"entry_price": entry_price, "quantity": commitments["quantity"]}),
+            prices[exit_day]
+        )
+        results.append({
+            "exit_day": exit_day,
+            "sold_on_signal": hit,
+            "holding_days": exit_day - entry,
+            "entry_price": entry_price,
+            "quantity": commitments["quantity"],
+            **settlement
+        })
+
+    return results
+
+
+def summarize(parts):
+    """Aggregate one parameter set's results across commodities."""
+    cat = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+    cost = cat["entry_price"] * cat["quantity"]
+    return_pct = cat["gross_profit"] / cost * 100
+
+    return {
+        "commitments": int(len(cost)),
+        "sold_on_signal_pct": round(float(cat["sold_on_signal"].mean() * 100), 2),
+        "mean_holding_days": round(float(cat["holding_days"].mean()), 2),
+        "median_holding_days": float(np.median(cat["holding_days"])),
+        "gross_profit": round(float(cat["gross_profit"].sum()), 2),
+        "platform_fee": round(float(cat["platform_fee"].sum()), 2),
+        "farmer_net": round(float((cat["gross_profit"] - cat["platform_fee"]).sum()), 2),
+        "mean_return_pct": round(float(return_pct.mean()), 3),
+        "win_rate_pct": round(float((cat["gross_profit"] > 0).mean() * 100), 2)
+    }
+
+
+def simulate(commodities=None, params=None, n_commitments=N_COMMITMENTS,
+             max_hold=MAX_HOLD_DAYS, floor_pct=None, walk_forward=False, seed=SEED):
+    """
+    Run the sweep; returns a list of {"params", **summary}, best farmer_net first.
+    n_commitments is per commodity.
+    """
+    start = time.perf_counter()
+    commodities = commodities or dataset.series()
+    params = params or parameter_grid()
+    rng = np.random.default_rng(seed)
+
+    per_param = [[] for _ in params]
+
+    for commodity in commodities:
+        history = market_history(commodity, walk_forward)
+        commitments = synthetic_commitments(len(history["prices"]), n_commitments, floor_pct, rng)
+
+        for p, result in enumerate(simulate_commodity(history, params, commitments, max_hold)):
+            per_param[p].append(result)
+
+    report = sorted(
+        ({"params": p, **summarize(parts)} for p, parts in zip(params, per_param)),
+        key=lambda r: r["farmer_net"],
+        reverse=True
+    )
+
+    print(f"⏱ {len(params)} parameter set(s) x {n_commitments * len(commodities)} "
+          f"commitments in {time.perf_counter() - start:.2f}s (fee rate {PLATFORM_FEE_RATE:.0%})")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay exit rules over historical prices")
+    parser.add_argument("--commodities", nargs="+", help="subset to simulate (default: all)")
+    parser.add_argument("--commitments", type=int, default=N_COMMITMENTS, help="synthetic commitments per commodity")
+    parser.add_argument("--max-hold", type=int, default=MAX_HOLD_DAYS, help="forced exit after N days")
+    parser.add_argument("--min-upside", type=float, nargs="+", default=[DEFAULT_MIN_UPSIDE_PCT], help="min_upside_pct values to sweep")
+    parser.add_argument("--sweep-switches", action="store_true", help="also sweep sell_on_bearish / sell_on_high_volatility")
+    parser.add_argument("--floor-pct", type=float, help="min_price as %% above the entry price (default: no floor)")
+    parser.add_argument("--walk-forward", action="store_true", help="use out-of-sample backtest forecasts")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", help="write the report as JSON")
+    args = parser.parse_args()
+
+    report = simulate(
+        args.commodities,
+        parameter_grid(args.min_upside, args.sweep_switches),
+        args.commitments, args.max_hold, args.floor_pct, args.walk_forward, args.seed
+    )
+
+    for row in report:
+        print(row)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.out}")
@@ -0,0 +1,59 @@
+import itertools
+import numpy as np
+
+from backend.exit_engine import (
+    decide_exit_signal, decide_exit_signals, SIGNALS, REASONS, SEASONAL_CODES, VOLATILITY_CODES
+)
+
+FORECASTS = [
+    [100, 101, 102, 103, 104, 105, 106],        # rising to the end
+    [106, 105, 104, 103, 102, 101, 100],        # falling
+    [100, 103, 106, 108, 106, 104, 102],        # peak mid-horizon
+    [100, 101, 102, 103, 104, 104.5, 104.2],    # small late dip
+    [100, 100, 100, 100, 100, 100, 100]         # flat
+]
+CURRENT_PRICES = [95.0, 100.0, 110.0]
+FLOORS = [None, 98.0, 105.0]
+MIN_UPSIDES = [0.0, 2.0, 5.0]
+SWITCHES = [True, False]
+
+
+def market(forecast, seasonal, volatility):
+    return {
+        "forecast_7_days": {f"day_{day}": price for day, price in enumerate(forecast, start=1)},
+        "seasonal_outlook": {"trend": seasonal},
+        "confidence_band": {"volatility_level": volatility}
+    }
+
+
+def test_vectorized_matches_scalar():
+    grid = list(itertools.product(
+        FORECASTS, SEASONAL_CODES, VOLATILITY_CODES, CURRENT_PRICES, FLOORS, MIN_UPSIDES,
+        SWITCHES, SWITCHES
+    ))
+
+    scalar = [
+        decide_exit_signal(
+            market(forecast, seasonal, volatility), min_upside_pct=upside, current_price=price,
+            min_price=floor, sell_on_bearish=bearish, sell_on_high_volatility=volatile
+        )
+        for forecast, seasonal, volatility, price, floor, upside, bearish, volatile in grid
+    ]
+
+    columns = list(zip(*grid))
+    signal, reason = decide_exit_signals(
+        np.array(columns[0], dtype=float),
+        np.array([SEASONAL_CODES[s] for s in columns[1]]),
+        np.array([VOLATILITY_CODES[v] for v in columns[2]]),
+        min_upside_pct=np.array(columns[5]),
+        current_price=np.array(columns[3]),
+        min_price=np.array([np.nan if f is None else f for f in columns[4]]),
+        sell_on_bearish=np.array(columns[6]),
+        sell_on_high_volatility=np.array(columns[7])
+    )
+
+    assert list(SIGNALS[signal]) == [s for s, _ in scalar]
+    assert [REASONS[r] for r in reason] == [r for _, r in scalar]
+
+    # Every rule is exercised by the grid
+    assert set(reason) == set(range(len(REASONS)))
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_engineering import create_features, FEATURES
+from backend import feature_state
+from backend.feature_state import EXOG_FEATURES
+
+
+def make_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Date": pd.date_range("2024-01-01", periods=n, freq="D"),
+        "Daily_Mandi_Price": 2000 + rng.normal(0, 25, n).cumsum()
+    })
+    for i, name in enumerate(EXOG_FEATURES):
+        df[name] = rng.normal(100 * (i + 1), 10, n)
+    return df
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """A one-series dataset whose frame and version the test replaces."""
+    data = {"frame": None, "version": 0}
+
+    def publish(frame):
+        data["frame"] = frame.reset_index(drop=True)
+        data["version"] += 1
+
+    monkeypatch.setattr(feature_state, "series", lambda: ["Rice"])
+    monkeypatch.setattr(feature_state, "get_commodity_frame", lambda key: data["frame"])
+    monkeypatch.setattr(feature_state, "data_version", lambda: data["version"])
+    monkeypatch.setattr(feature_state, "_states", {})
+    monkeypatch.setattr(feature_state, "_version", None)
+    return publish
+
+
+def expected(frame):
+    return create_features(frame.copy())[FEATURES].iloc[-1].to_numpy(dtype=float)
+
+
+def test_bootstrap_matches_create_features(store):
+    frame = make_frame(60)
+    store(frame)
+
+    np.testing.assert_allclose(feature_state.get_state("Rice").latest_features(), expected(frame))
+
+
+def test_append_matches_create_features(store):
+    frame = make_frame(60)
+    store(frame.iloc[:50])
+    state = feature_state.get_state("Rice")
+
+    for end in (51, 55, 60):
+        store(frame.iloc[:end])
+        assert feature_state.get_state("Rice") is state  # pushed, not rebuilt
+        np.testing.assert_allclose(state.latest_features(), expected(frame.iloc[:end]))
+
+
+def test_backfill_matches_create_features(store):
+    frame = make_frame(62)
+    store(frame.iloc[:60].drop(index=[45, 52]))
+    feature_state.get_state("Rice")
+
+    # The missing days arrive late, together with a new one
+    store(frame.iloc[:61])
+    state = feature_state.get_state("Rice")
+
+    np.testing.assert_allclose(state.latest_features(), expected(frame.iloc[:61]))
+    np.testing.assert_allclose(state.price_window(), frame["Daily_Mandi_Price"].iloc[47:61])
+
+
+def test_truncated_history_rebuilds(store):
+    frame = make_frame(60)
+    store(frame.drop(index=[45, 52]))
+    feature_state.get_state("Rice")
+
+    # Same number of rows as before, but the last two days are gone
+    store(frame.iloc[:58])
+
+    np.testing.assert_allclose(feature_state.get_state("Rice").latest_features(), expected(frame.iloc[:58]))
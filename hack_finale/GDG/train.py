@@ -1,57 +1,411 @@
-import pandas as pd
-import joblib
-import os
-from xgboost import XGBRegressor
-from feature_engineering import create_features
-
-DATA_FILE = "data/Agriculture_Dataset_2020_2026.xlsx"
-MODEL_DIR = "models"
-
-os.makedirs(MODEL_DIR, exist_ok=True)
-
-df = pd.read_excel(DATA_FILE)
-df["Date"] = pd.to_datetime(df["Date"])
-
-FEATURES = [
-    "MSP",
-    "Procurement_Season_Flag",
-    "Export_Ban_Flag",
-    "FCI_Stock_LMT",
-    "Daily_Arrivals_Tonnes",
-    "Rainfall_Deviation_Pct",
-    "Festival_Season_Flag",
-    "Fertilizer_Price_Index",
-    "Price_Lag_1",
-    "Price_Lag_3",
-    "Price_Lag_7",
-    "Price_MA_7",
-    "Price_MA_14",
-    "Price_Trend",
-    "Arrival_MA_7",
-    "Rain_7d_Avg"
-]
-
-TARGET = "Daily_Mandi_Price"
-
-for commodity in df["Commodity"].unique():
-    print(f"Training model for {commodity}...")
-
-    cdf = df[df["Commodity"] == commodity].copy()
-    cdf = create_features(cdf)
-
-    X = cdf[FEATURES]
-    y = cdf[TARGET]
-
-    model = XGBRegressor(
-        n_estimators=300,
-        max_depth=5,
-        learning_rate=0.05,
-        subsample=0.8,
-        colsample_bytree=0.8,
-        random_state=42
-    )
-
-    model.fit(X, y)
-    joblib.dump(model, f"{MODEL_DIR}/{commodity}.pkl")
-
-print("✅ Training complete. Models saved in /models")
+"""
+Train one XGBoost model per series, or one global model for all of them.
+
+    python train.py                              # every series
+    python train.py --commodities Rice Wheat     # a subset
+    python train.py --workers 2 --threads 4
+    python train.py --retrain [--mode warm|window]
+    python train.py --global                     # models/global.pkl
+
+A series is a commodity, or a commodity in one market ("Rice@Karnal")
+when the dataset has a Market column (see backend/dataset.py).
+
+The dataset is loaded and feature-engineered once in the parent process;
+each worker process only fits. Cores are split between workers so that
+workers * threads never oversubscribes the machine.
+"""
+
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import xgboost
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from xgboost import XGBRegressor
+from feature_engineering import create_features, FEATURES
+from backend import dataset
+from backend.global_model import GlobalPriceModel
+from backend.model_registry import (
+    save_model, get_model, model_metadata as saved_metadata, has_global_model, has_model, GLOBAL_MODEL
+)
+
+TARGET = "Daily_Mandi_Price"
+
+MODEL_PARAMS = {
+    "n_estimators": 300,
+    "max_depth": 5,
+    "learning_rate": 0.05,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+    "random_state": 42
+}
+
+
+def training_data(commodities=None):
+    """{series: (X, y, dates)} with features built once per series."""
+    data = {}
+
+    for key in commodities or dataset.series():
+        cdf = create_features(dataset.get_series_frame(key).copy())
+        data[key] = (cdf[FEATURES], cdf[TARGET], cdf["Date"])
+
+    return data
+
+
+def fit_model(X, y, threads=None, **params):
+    model = XGBRegressor(**{**MODEL_PARAMS, **params}, n_jobs=threads)
+    model.fit(X, y)
+
+    # Serving decides its own thread count (see model_registry.MODEL_THREADS)
+    model.set_params(n_jobs=None)
+    return model
+
+
+def model_metadata(X, dates, fit_seconds, **extra):
+    now = datetime.now()
+    return {
+        "version": now.strftime("%Y%m%d%H%M%S"),
+        "trained_at": now.isoformat(),
+        "rows": int(len(X)),
+        "data_start": str(dates.min().date()),
+        "data_end": str(dates.max().date()),
+        "fit_seconds": round(fit_seconds, 3),
+        "features": FEATURES,
+        "params": MODEL_PARAMS,
+        "xgboost_version": xgboost.__version__,
+        **extra
+    }
+
+
+def train_commodity(commodity, X, y, dates, threads=None):
+    """Fit and save one commodity's model. Runs inside a worker process."""
+    start = time.perf_counter()
+    model = fit_model(X, y, threads)
+    fit_seconds = time.perf_counter() - start
+
+    metadata = model_metadata(X, dates, fit_seconds, mode="full")
+    save_model(model, commodity, metadata)
+    return commodity, metadata
+
+
+def split_cores(n_models, workers=None, threads=None):
+    """(workers, threads per worker) for n_models on this machine."""
+    cores = os.cpu_count() or 1
+    workers = max(1, min(workers or cores, n_models))
+    threads = threads or max(1, cores // workers)
+    return workers, threads
+
+
+def train(commodities=None, workers=None, threads=None):
+    start = time.perf_counter()
+    data = training_data(commodities)
+    print(f"📦 Prepared {len(data)} commodities in {time.perf_counter() - start:.2f}s")
+
+    workers, threads = split_cores(len(data), workers, threads)
+    print(f"⚙️ {workers} worker(s) x {threads} XGBoost thread(s)")
+
+    results = {}
+
+    if workers == 1:
+        for commodity, (X, y, dates) in data.items():
+            print(f"Training model for {commodity}...")
+            _, results[commodity] = train_commodity(commodity, X, y, dates, threads)
+            print(f"✅ {commodity}: {results[commodity]['fit_seconds']:.2f}s")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(train_commodity, commodity, X, y, dates, threads)
+                for commodity, (X, y, dates) in data.items()
+            ]
+            for future in as_completed(futures):
+                commodity, metadata = future.result()
+                results[commodity] = metadata
+                print(f"✅ {commodity}: {metadata['fit_seconds']:.2f}s")
+
+    print(f"⏱ total: {time.perf_counter() - start:.2f}s")
+    return results
+
+
+# ---------------- GLOBAL MODEL ----------------
+# One booster over the stacked rows of every series (backend/global_model.py).
+# Training time grows with the number of rows, the artifact does not grow
+# with the number of series, and serving needs one predict call per step.
+
+def _stack(data, holdout=None):
+    """(X, y, dates, keys) of every series' rows, minus each one's newest holdout[series]."""
+    holdout = holdout or {}
+    parts = {
+        key: [part.iloc[:len(part) - holdout.get(key, 0)] for part in rows]
+        for key, rows in data.items()
+    }
+
+    X = pd.concat([X for X, _, _ in parts.values()], ignore_index=True)
+    y = pd.concat([y for _, y, _ in parts.values()], ignore_index=True)
+    dates = pd.concat([d for _, _, d in parts.values()], ignore_index=True)
+    keys = np.repeat(list(parts), [len(X) for X, _, _ in parts.values()])
+    return X, y, dates, keys
+
+
+def train_global(series=None, threads=None, data=None):
+    start = time.perf_counter()
+    data = data or training_data(series)
+
+    X, y, dates, keys = _stack(data)
+    print(f"📦 Stacked {len(X)} rows from {len(data)} series in {time.perf_counter() - start:.2f}s")
+
+    fit_start = time.perf_counter()
+    model = GlobalPriceModel(**MODEL_PARAMS).fit(X, y, keys, n_jobs=threads)
+    fit_seconds = time.perf_counter() - fit_start
+
+    metadata = model_metadata(X, dates, fit_seconds, mode="global", series=sorted(data))
+    save_model(model, GLOBAL_MODEL, metadata)
+
+    print(f"✅ global: {fit_seconds:.2f}s")
+    return metadata
+
+
+# ---------------- INCREMENTAL RETRAINING ----------------
+# Run after daily_update appends rows. A candidate is built without the
+# newest rows, which the current model has not seen either (they are dated
+# after its data_end), and only replaces it when evaluate_accuracy's
+# metrics on those held-out rows do not get worse.
+# A promoted candidate is then refit with the held-out rows included.
+
+WARM_START_ROUNDS = 30      # trees added on top of the current model
+MIN_WARM_ROWS = 14          # wait for two weeks of new rows (half are held out)
+WINDOW_DAYS = 730           # "window" mode: refit on the last two years
+HOLDOUT_DAYS = 30           # newest rows the candidate is scored on
+MIN_HOLDOUT_ROWS = 7        # fewer unseen rows than this and the gate is skipped
+
+# Allowed slack before a candidate counts as a regression
+TOLERANCE_PCT = 1.0
+
+
+def _no_regression(new, old):
+    slack = 1 + TOLERANCE_PCT / 100
+    return (
+        new["mape_pct"] <= old["mape_pct"] * slack
+        and new["rmse"] <= old["rmse"] * slack
+        and new["directional_accuracy_pct"] >= old["directional_accuracy_pct"] - TOLERANCE_PCT
+    )
+
+
+def retrain_commodity(commodity, X, y, dates, mode="warm", threads=None):
+    """
+    Build a candidate for one commodity and promote it if it does not regress.
+
+    warm    continue boosting the current model on rows newer than its
+            data_end (needs metadata from a previous train/retrain);
+            the newest half of those rows, at most HOLDOUT_DAYS, is held out
+    window  refit from scratch on the last WINDOW_DAYS rows; the rows newer
+            than data_end, at most HOLDOUT_DAYS, are held out
+    """
+    # evaluate_accuracy -> backtest imports this module
+    from evaluate_accuracy import score_model
+
+    meta = saved_metadata(commodity)
+    current = get_model(commodity)
+    start = time.perf_counter()
+
+    if "data_end" not in meta:
+        return commodity, {"promoted": False, "reason": "no training metadata; run train.py first"}
+
+    # Only rows the current model has not seen make a fair holdout
+    unseen = np.flatnonzero((dates > meta["data_end"]).to_numpy())
+
+    if mode == "warm":
+        if len(unseen) < MIN_WARM_ROWS:
+            return commodity, {"promoted": False, "reason": f"{len(unseen)} new rows"}
+
+        rows = unseen
+        holdout = min(HOLDOUT_DAYS, len(rows) // 2)
+
+        def fit(rows):
+            model = XGBRegressor(**{**MODEL_PARAMS, "n_estimators": WARM_START_ROUNDS}, n_jobs=threads)
+            model.fit(X.iloc[rows], y.iloc[rows], xgb_model=current.get_booster())
+            return model.set_params(n_jobs=None)
+
+        extra = {"base_version": meta.get("version"), "new_rows": len(rows)}
+
+    elif mode == "window":
+        holdout = min(HOLDOUT_DAYS, len(unseen))
+        if holdout < MIN_HOLDOUT_ROWS:
+            return commodity, {"promoted": False, "reason": f"{len(unseen)} rows after data_end to score on"}
+
+        rows = np.arange(max(len(y) - WINDOW_DAYS, 0), len(y))
+
+        def fit(rows):
+            return fit_model(X.iloc[rows], y.iloc[rows], threads)
+
+        extra = {"window_days": WINDOW_DAYS}
+
+    else:
+        raise ValueError(f"Unknown retrain mode: {mode}")
+
+    # Both models are scored only on rows the candidate was not fit on
+    candidate = fit(rows[:-holdout])
+    cdf = X.assign(**{TARGET: y})
+    old_metrics = score_model(current, cdf, commodity, holdout)
+    new_metrics = score_model(candidate, cdf, commodity, holdout)
+
+    result = {
+        "promoted": _no_regression(new_metrics, old_metrics),
+        "holdout_rows": holdout,
+        "metrics": new_metrics,
+        "previous_metrics": old_metrics
+    }
+
+    if result["promoted"]:
+        candidate = fit(rows)
+
+    fit_seconds = time.perf_counter() - start
+    result["fit_seconds"] = round(fit_seconds, 3)
+
+    if result["promoted"]:
+        X, dates = X.iloc[rows], dates.iloc[rows]
+        metadata = model_metadata(X, dates, fit_seconds, mode=mode, metrics=new_metrics, **extra)
+        if mode == "warm":
+            # The model now covers everything up to the newest row
+            metadata["data_start"] = meta.get("data_start", metadata["data_start"])
+            metadata["rows"] = meta.get("rows", 0) + extra["new_rows"]
+        save_model(candidate, commodity, metadata)
+    else:
+        result["reason"] = "candidate regressed"
+
+    return commodity, result
+
+
+def retrain_global(threads=None):
+    """
+    Refit the global model without the rows dated after its data_end (at
+    most HOLDOUT_DAYS per series) and promote it only if it does not regress
+    on any series' holdout. Series with fewer than MIN_HOLDOUT_ROWS such rows
+    are fit on but not scored. A promoted candidate is refit on every row.
+    Returns {series: result}.
+    """
+    from evaluate_accuracy import score_model
+
+    start = time.perf_counter()
+    meta = saved_metadata(GLOBAL_MODEL)
+    data = training_data()
+
+    if "data_end" not in meta:
+        reason = "no training metadata; run train.py --global first"
+        return {key: {"promoted": False, "reason": reason} for key in data}
+
+    # Only rows the current model has not seen make a fair holdout
+    holdout = {}
+    for key, (_, _, dates) in data.items():
+        rows = min(HOLDOUT_DAYS, int((dates > meta["data_end"]).sum()))
+        if rows >= MIN_HOLDOUT_ROWS:
+            holdout[key] = rows
+
+    if not holdout:
+        reason = f"fewer than {MIN_HOLDOUT_ROWS} rows after data_end to score on"
+        return {key: {"promoted": False, "reason": reason} for key in data}
+
+    current = get_model(GLOBAL_MODEL)
+    X, y, _, keys = _stack(data, holdout)
+    candidate = GlobalPriceModel(**MODEL_PARAMS).fit(X, y, keys, n_jobs=threads)
+
+    results = {}
+    for key, rows in holdout.items():
+        X, y, _ = data[key]
+        cdf = X.assign(**{TARGET: y})
+        new_metrics = score_model(candidate, cdf, key, rows)
+        old_metrics = score_model(current, cdf, key, rows)
+        results[key] = {
+            "promoted": _no_regression(new_metrics, old_metrics),
+            "holdout_rows": rows,
+            "metrics": new_metrics,
+            "previous_metrics": old_metrics
+        }
+
+    # One model serves every series: it is replaced for all or for none
+    promoted = all(result["promoted"] for result in results.values())
+    if promoted:
+        train_global(threads=threads, data=data)
+
+    fit_seconds = round(time.perf_counter() - start, 3)
+    for result in results.values():
+        if not promoted:
+            result["reason"] = ("candidate regressed" if not result["promoted"]
+                                else "candidate regressed on another series")
+        result["promoted"] = promoted
+        result["fit_seconds"] = fit_seconds
+
+    for key in data.keys() - holdout.keys():
+        results[key] = {"promoted": promoted, "fit_seconds": fit_seconds,
+                        "reason": "too few rows after data_end to score on"}
+
+    return results
+
+
+def _report(results, mode):
+    for commodity, result in results.items():
+        if result["promoted"] and "metrics" in result:
+            m, old = result["metrics"], result["previous_metrics"]
+            print(f"🔄 {commodity}: promoted ({mode}, {result['fit_seconds']:.2f}s) "
+                  f"MAPE {old['mape_pct']} → {m['mape_pct']}")
+        elif result["promoted"]:
+            print(f"🔄 {commodity}: promoted ({mode}, {result['fit_seconds']:.2f}s; {result['reason']})")
+        else:
+            print(f"⏸ {commodity}: kept current model ({result['reason']})")
+
+
+def retrain(commodities=None, mode="warm", workers=None, threads=None):
+    """Retrain every series with a saved model; returns {series: result}."""
+    if has_global_model():
+        # One model serves every series, so it is retrained as a whole
+        print("🔄 global model in use: retraining it instead")
+        results = retrain_global(threads)
+        _report(results, "global")
+        return results
+
+    keys = [key for key in commodities or dataset.series() if has_model(key)]
+    if not keys:
+        print("⏸ No saved models to retrain; run train.py first")
+        return {}
+
+    data = training_data(keys)
+    workers, threads = split_cores(len(data), workers, threads)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            commodity: pool.submit(retrain_commodity, commodity, X, y, dates, mode, threads)
+            for commodity, (X, y, dates) in data.items()
+        }
+
+        # One failing series must not stop the others from being retrained
+        for commodity, future in futures.items():
+            try:
+                results[commodity] = future.result()[1]
+            except Exception as e:
+                results[commodity] = {"promoted": False, "reason": f"failed: {e}"}
+
+    _report(results, mode)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train price models")
+    parser.add_argument("--commodities", nargs="+", help="series to train (default: all)")
+    parser.add_argument("--workers", type=int, help="training processes (default: one per core)")
+    parser.add_argument("--threads", type=int, help="XGBoost threads per worker")
+    parser.add_argument("--retrain", action="store_true", help="update existing models instead of training from scratch")
+    parser.add_argument("--mode", choices=["warm", "window"], default="warm", help="retraining mode")
+    parser.add_argument("--global", dest="global_model", action="store_true",
+                        help="train one model for every series")
+    args = parser.parse_args()
+
+    if args.global_model:
+        train_global(args.commodities, args.threads)
+        print("✅ Training complete. Model saved in /models/global.pkl")
+    elif args.retrain:
+        retrain(args.commodities, args.mode, args.workers, args.threads)
+    else:
+        train(args.commodities, args.workers, args.threads)
+        print("✅ Training complete. Models saved in /models")
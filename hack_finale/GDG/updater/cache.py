@@ -0,0 +1,42 @@
+import os
+import json
+
+CACHE_DIR = "data/cache"
+
+
+def _path(source, date):
+    return os.path.join(CACHE_DIR, date, f"{source}.json")
+
+
+def load(source, date):
+    """Cached response for (source, date), or None."""
+    path = _path(source, date)
+    if not os.path.exists(path):
+        return None
+
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save(source, date, value):
+    path = _path(source, date)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(value, f)
+    os.replace(tmp, path)
+
+
+def cached(source, date, fetch):
+    """
+    Return the cached value for (source, date), calling fetch() and storing
+    its JSON-serialisable result only on a miss. Returns (value, hit).
+    """
+    value = load(source, date)
+    if value is not None:
+        return value, True
+
+    value = fetch()
+    save(source, date, value)
+    return value, False
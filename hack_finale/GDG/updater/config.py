@@ -1,18 +1,14 @@
-# =========================
-# API KEYS
-# =========================
-
-DATA_GOV_API_KEY = "579b464db66ec23bdd00000172c4e705975140cc593abe0b30b8565f"
-NEWS_API_KEY = "266a242eb1c24305a6e25d627c103d9b"
-
-# =========================
-# FILE PATH
-# =========================
-
-DATA_FILE = "data/Agriculture_Dataset_2020_2026.xlsx"
-
-# =========================
-# COMMODITIES
-# =========================
-
-COMMODITIES = ["Banana", "Coconut", "Rice", "Wheat"]
+# =========================
+# API KEYS
+# =========================
+
+DATA_GOV_API_KEY = "579b464db66ec23bdd00000172c4e705975140cc593abe0b30b8565f"
+NEWS_API_KEY = "266a242eb1c24305a6e25d627c103d9b"
+
+# =========================
+# FILE PATH
+# =========================
+
+# Excel is the import/export format; the live dataset is the columnar
+# store under data/store (see backend/storage.py)
+DATA_FILE = "data/Agriculture_Dataset_2020_2026.xlsx"
@@ -1,67 +1,268 @@
-print("🚀 daily_update.py file loaded")
-
-import pandas as pd
-from datetime import datetime
-from updater.fetch_mandi import fetch_mandi_prices
-from updater.fetch_weather import fetch_rainfall_mm
-from updater.fetch_news import fetch_policy_flags
-from updater.config import DATA_FILE, COMMODITIES
-
-def daily_update():
-    print("🔁 daily_update() started")
-
-    today = datetime.today().strftime("%Y-%m-%d")
-    print(f"📅 Date: {today}")
-
-    df = pd.read_excel(DATA_FILE)
-    df.columns = df.columns.str.strip()
-
-    if today in df["Date"].astype(str).values:
-        print("✅ Data already exists for today")
-        return
-
-    print("🌾 Fetching mandi data...")
-    mandi_df = fetch_mandi_prices(today)
-
-    print("📰 Fetching news signals...")
-    policy_flags = fetch_policy_flags()
-
-    print("🌧 Fetching weather...")
-    rainfall = fetch_rainfall_mm()
-
-    new_rows = []
-
-    for commodity in COMMODITIES:
-        print(f"➕ Updating {commodity}")
-
-        hist = df[df["Commodity"] == commodity].iloc[-1]
-
-        mdf = mandi_df[
-            mandi_df["commodity"].str.lower() == commodity.lower()
-        ] if not mandi_df.empty else pd.DataFrame()
-
-        price = float(mdf["modal_price"].mean()) if not mdf.empty else hist["Daily_Mandi_Price"]
-        arrivals = float(mdf["arrivals"].mean()) if not mdf.empty else hist["Daily_Arrivals_Tonnes"]
-
-        new_rows.append({
-            "Date": today,
-            "Commodity": commodity,
-            "MSP": hist["MSP"],
-            "Procurement_Season_Flag": policy_flags["Procurement_Season_Flag"],
-            "Export_Ban_Flag": policy_flags["Export_Ban_Flag"],
-            "FCI_Stock_LMT": hist["FCI_Stock_LMT"],
-            "Daily_Mandi_Price": price,
-            "Daily_Arrivals_Tonnes": arrivals,
-            "Rainfall_Deviation_Pct": rainfall,
-            "Festival_Season_Flag": 0,
-            "Fertilizer_Price_Index": hist["Fertilizer_Price_Index"]
-        })
-
-    df = pd.concat([df, pd.DataFrame(new_rows)], ignore_index=True)
-    df.to_excel(DATA_FILE, index=False)
-
-    print("🎉 DAILY UPDATE COMPLETED SUCCESSFULLY")
-
-if __name__ == "__main__":
-    print("▶️ Running as module")
-    daily_update()
+print("🚀 daily_update.py file loaded")
+
+import sys
+import time
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from updater import cache
+from updater.fetch_mandi import aggregate_mandi_prices
+from updater.fetch_weather import fetch_rainfall_mm
+from updater.fetch_news import fetch_policy_flags
+from backend import storage, metrics
+from backend.dataset import get_series_frame, get_dataset, series, split_series
+from backend.intelligence import warm_forecasts
+from backend.conformal import update_residuals
+from train import retrain
+
+BACKFILL_WORKERS = 4
+
+
+def _timed_fetch(source, date, fetch):
+    start = time.perf_counter()
+    with metrics.timer(f"fetch_{source}"):
+        value, hit = cache.cached(source, date, fetch)
+
+    metrics.inc("harvesthub_cache_hits_total" if hit else "harvesthub_cache_misses_total", cache="updater")
+    return value, hit, time.perf_counter() - start
+
+
+def fetch_sources(date, live=True):
+    """
+    Fetch mandi prices, news flags and rainfall for `date` concurrently.
+    Each response is cached under data/cache/<date>/, so a re-run (or a
+    run after one source failed) only downloads what is missing.
+    live=False asks news and weather for that date instead of "now".
+    """
+    sources = {
+        "mandi_summary": lambda: aggregate_mandi_prices(date),
+        "news": fetch_policy_flags if live else lambda: fetch_policy_flags(date=date),
+        "weather": fetch_rainfall_mm if live else lambda: fetch_rainfall_mm(date=date)
+    }
+
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        futures = {
+            name: pool.submit(_timed_fetch, name, date, fetch)
+            for name, fetch in sources.items()
+        }
+
+    results, errors = {}, {}
+    for name, future in futures.items():
+        try:
+            value, hit, seconds = future.result()
+            results[name] = value
+            print(f"⏱ {date} {name}: {seconds:.2f}s{' (cached)' if hit else ''}")
+        except Exception as e:
+            errors[name] = e
+            print(f"❌ {date} {name}: {e}")
+
+    if errors:
+        raise RuntimeError(f"Failed to fetch: {', '.join(errors)}") from next(iter(errors.values()))
+
+    return results
+
+
+def build_row(date, key, sources, hist):
+    """
+    One dataset row for series `key` on `date`. `hist` is the previous row of
+    that series; it supplies the slow-moving columns and the fallback
+    price/arrivals when the mandi API has nothing for the day.
+    """
+    commodity, market = split_series(key)
+    summary = sources["mandi_summary"].get(key.lower(), {})
+
+    price = summary.get("modal_price") or hist["Daily_Mandi_Price"]
+    arrivals = summary.get("arrivals") or hist["Daily_Arrivals_Tonnes"]
+
+    return {
+        "Date": pd.Timestamp(date),
+        "Commodity": commodity,
+        "Market": market,       # dropped by the store when it has no Market column
+        "MSP": hist["MSP"],
+        "Procurement_Season_Flag": sources["news"]["Procurement_Season_Flag"],
+        "Export_Ban_Flag": sources["news"]["Export_Ban_Flag"],
+        "FCI_Stock_LMT": hist["FCI_Stock_LMT"],
+        "Daily_Mandi_Price": price,
+        "Daily_Arrivals_Tonnes": arrivals,
+        "Rainfall_Deviation_Pct": sources["weather"],
+        "Festival_Season_Flag": 0,
+        "Fertilizer_Price_Index": hist["Fertilizer_Price_Index"]
+    }
+
+
+def retrain_models(mode="warm"):
+    """Retrain after new rows land; a failure here never undoes the update."""
+    print("🧠 Retraining models...")
+    try:
+        with metrics.timer("retrain"):
+            retrain(None, mode)
+    except Exception as e:
+        print(f"❌ Retraining failed, keeping current models: {e}")
+
+
+def update_bands():
+    """Score earlier forecasts against the new prices (backend/conformal.py)."""
+    print("📏 Updating confidence band residuals...")
+    try:
+        with metrics.timer("conformal_update"):
+            update_residuals()
+    except Exception as e:
+        print(f"❌ Band update failed, keeping current tables: {e}")
+
+
+@metrics.timed("daily_update")
+def daily_update(warm_cache=False, retrain_mode="warm"):
+    """
+    Append today's row for every series, retrain the models
+    (retrain_mode "warm", "window" or None to skip) and update the
+    confidence band residuals.
+    warm_cache=True rebuilds the forecast cache right away; use it when the
+    update runs inside the API process.
+    """
+    print("🔁 daily_update() started")
+
+    today = datetime.today().strftime("%Y-%m-%d")
+    print(f"📅 Date: {today}")
+
+    df = get_dataset()
+
+    if (df["Date"] == pd.Timestamp(today)).any():
+        print("✅ Data already exists for today")
+        return
+
+    print("🌐 Fetching mandi data, news signals and weather...")
+    start = time.perf_counter()
+    sources = fetch_sources(today)
+    print(f"⏱ all sources: {time.perf_counter() - start:.2f}s")
+
+    keys = series()
+    new_rows = []
+
+    for key in keys:
+        print(f"➕ Updating {key}")
+        hist = get_series_frame(key).iloc[-1]
+        new_rows.append(build_row(today, key, sources, hist))
+
+    with metrics.timer("daily_update_write"):
+        storage.append_rows(pd.DataFrame(new_rows))
+
+    if retrain_mode:
+        retrain_models(retrain_mode)
+
+    update_bands()
+
+    if warm_cache:
+        print("🔥 Warming forecast cache...")
+        warm_forecasts(keys)
+
+    print("🎉 DAILY UPDATE COMPLETED SUCCESSFULLY")
+
+
+# ---------------- BACKFILL ----------------
+
+def _series_dates():
+    """{series: set of dates it has a row for}"""
+    return {key: set(get_series_frame(key)["Date"]) for key in series()}
+
+
+def missing_dates(start, end):
+    """Dates in [start, end] that lack a row for at least one series."""
+    have = _series_dates()
+    dates = pd.date_range(start, end, freq="D")
+    return [d for d in dates if any(d not in days for days in have.values())]
+
+
+@metrics.timed("backfill")
+def backfill(start, end, max_workers=BACKFILL_WORKERS, warm_cache=False, retrain_mode="warm"):
+    """
+    Fill every missing day in [start, end] (YYYY-MM-DD, inclusive).
+
+    Days are fetched in parallel, at most `max_workers` at a time (each day
+    still fetches its three sources concurrently). Rows are then built in
+    date order, each day carrying forward the previous day's values, and
+    written to the store in a single append. Days whose fetch failed are
+    reported and left out; re-running picks them up from the fetch cache.
+    """
+    print(f"🔁 backfill {start} → {end}")
+
+    dates = missing_dates(start, end)
+    if not dates:
+        print("✅ No missing days in range")
+        return []
+
+    print(f"🌐 Fetching {len(dates)} missing day(s) with {max_workers} worker(s)...")
+    t0 = time.perf_counter()
+
+    fetched, failed = {}, []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(fetch_sources, d.strftime("%Y-%m-%d"), False): d
+            for d in dates
+        }
+        for future in as_completed(futures):
+            d = futures[future]
+            try:
+                fetched[d] = future.result()
+            except Exception as e:
+                failed.append(d)
+                print(f"❌ {d.date()}: {e}")
+
+    print(f"⏱ fetched {len(fetched)} day(s) in {time.perf_counter() - t0:.2f}s")
+
+    existing = _series_dates()
+
+    new_rows = []
+    for key, have in existing.items():
+        cdf = get_series_frame(key)
+
+        for d in sorted(fetched):
+            if d in have:
+                continue
+
+            before = cdf[cdf["Date"] < d]
+            if before.empty:
+                continue
+
+            hist = before.iloc[-1]
+            row = build_row(d, key, fetched[d], hist)
+            new_rows.append(row)
+
+            # Later days in the gap carry this row forward
+            cdf = pd.concat([before, pd.DataFrame([row]), cdf[cdf["Date"] > d]], ignore_index=True)
+
+    if new_rows:
+        new_df = pd.DataFrame(new_rows).sort_values(["Date", "Commodity"], kind="stable")
+        with metrics.timer("daily_update_write"):
+            storage.append_rows(new_df)
+        print(f"➕ Appended {len(new_df)} row(s) for {new_df['Date'].nunique()} day(s)")
+
+        if retrain_mode:
+            retrain_models(retrain_mode)
+
+        update_bands()
+
+    if failed:
+        print(f"⚠️ {len(failed)} day(s) failed: {', '.join(str(d.date()) for d in sorted(failed))}")
+
+    if warm_cache and new_rows:
+        print("🔥 Warming forecast cache...")
+        warm_forecasts(list(existing))
+
+    print("🎉 BACKFILL COMPLETED")
+    return sorted(fetched)
+
+if __name__ == "__main__":
+    print("▶️ Running as module")
+
+    # python -m updater.daily_update backfill START END [workers]
+    if len(sys.argv) >= 4 and sys.argv[1] == "backfill":
+        workers = int(sys.argv[4]) if len(sys.argv) > 4 else BACKFILL_WORKERS
+        try:
+            backfill(sys.argv[2], sys.argv[3], max_workers=workers)
+        finally:
+            metrics.dump("backfill")
+    else:
+        try:
+            daily_update()
+        finally:
+            metrics.dump("daily_update")
@@ -1,24 +1,161 @@
-import requests
-import pandas as pd
-from updater.config import DATA_GOV_API_KEY
-
-RESOURCE_ID = "9ef84268-d588-465a-a308-a864a43d0070"
-
-def fetch_mandi_prices(date):
-    """
-    Fetch mandi prices from data.gov.in for a given date (YYYY-MM-DD)
-    """
-    url = f"https://api.data.gov.in/resource/{RESOURCE_ID}"
-
-    params = {
-        "api-key": DATA_GOV_API_KEY,
-        "format": "json",
-        "filters[Arrival_Date]": date,
-        "limit": 1000
-    }
-
-    response = requests.get(url, params=params, timeout=30)
-    response.raise_for_status()
-
-    records = response.json().get("records", [])
-    return pd.DataFrame(records)
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from updater import cache
+from updater.config import DATA_GOV_API_KEY
+from updater.session import get_session
+from backend.dataset import series_key
+
+RESOURCE_ID = "9ef84268-d588-465a-a308-a864a43d0070"
+
+PAGE_SIZE = 1000
+MAX_CONCURRENCY = 4
+
+
+def _fetch_page(date, offset, limit=PAGE_SIZE):
+    """One page of records plus the total record count (None if unknown)."""
+    url = f"https://api.data.gov.in/resource/{RESOURCE_ID}"
+
+    params = {
+        "api-key": DATA_GOV_API_KEY,
+        "format": "json",
+        "filters[Arrival_Date]": date,
+        "offset": offset,
+        "limit": limit
+    }
+
+    response = get_session().get(url, params=params, timeout=30)
+    response.raise_for_status()
+
+    data = response.json()
+    total = data.get("total")
+    return data.get("records", []), int(total) if total is not None else None
+
+
+def iter_mandi_batches(date, page_size=PAGE_SIZE, start_offset=0,
+                       max_concurrency=MAX_CONCURRENCY):
+    """
+    Yield (offset, records) for every page of a day's mandi records, in
+    offset order. The first page tells us the total; the remaining pages
+    are fetched with at most `max_concurrency` requests in flight.
+    """
+    records, total = _fetch_page(date, start_offset, page_size)
+    yield start_offset, records
+
+    if total is None:
+        # No total reported: walk pages one by one until a short page
+        offset = start_offset
+        while len(records) == page_size:
+            offset += page_size
+            records, _ = _fetch_page(date, offset, page_size)
+            yield offset, records
+        return
+
+    offsets = iter(range(start_offset + page_size, total, page_size))
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        window = []
+        for offset in offsets:
+            window.append((offset, pool.submit(_fetch_page, date, offset, page_size)))
+            if len(window) == max_concurrency:
+                break
+
+        while window:
+            offset, future = window.pop(0)
+            yield offset, future.result()[0]
+
+            next_offset = next(offsets, None)
+            if next_offset is not None:
+                window.append((next_offset, pool.submit(_fetch_page, date, next_offset, page_size)))
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MandiAggregate:
+    """
+    Running sums of modal price and arrivals per commodity and per
+    commodity in one market ("rice" and "rice@karnal", matching the
+    dataset's series keys in lower case).
+    """
+
+    def __init__(self, sums=None):
+        # series key (lower case) -> [price_sum, price_n, arrivals_sum, arrivals_n]
+        self.sums = sums or {}
+
+    def add(self, records):
+        for record in records:
+            commodity = str(record.get("commodity", "")).strip().lower()
+            if not commodity:
+                continue
+
+            market = str(record.get("market", "")).strip().lower()
+            keys = [commodity, series_key(commodity, market)] if market else [commodity]
+
+            price = _to_float(record.get("modal_price"))
+            arrivals = _to_float(record.get("arrivals"))
+
+            for key in keys:
+                s = self.sums.setdefault(key, [0.0, 0, 0.0, 0])
+
+                if price is not None:
+                    s[0] += price
+                    s[1] += 1
+
+                if arrivals is not None:
+                    s[2] += arrivals
+                    s[3] += 1
+
+    def summary(self):
+        return {
+            commodity: {
+                "modal_price": s[0] / s[1] if s[1] else None,
+                "arrivals": s[2] / s[3] if s[3] else None,
+                "records": s[1]
+            }
+            for commodity, s in self.sums.items()
+        }
+
+
+def aggregate_mandi_prices(date, page_size=PAGE_SIZE, max_concurrency=MAX_CONCURRENCY):
+    """
+    Stream every page for `date` into per-commodity and per-market averages:
+    {series key (lower case): {"modal_price", "arrivals", "records"}}.
+
+    Progress is checkpointed after each page under data/cache/<date>/, so
+    an interrupted run resumes from the next offset instead of page 0.
+    """
+    progress = cache.load("mandi_progress", date) or {"next_offset": 0, "sums": {}}
+    aggregate = MandiAggregate(progress["sums"])
+
+    for offset, records in iter_mandi_batches(
+        date, page_size, progress["next_offset"], max_concurrency
+    ):
+        aggregate.add(records)
+        cache.save("mandi_progress", date, {
+            "next_offset": offset + page_size,
+            "sums": aggregate.sums
+        })
+
+    return aggregate.summary()
+
+
+def fetch_mandi_records(date):
+    """
+    Fetch raw mandi records from data.gov.in for a given date (YYYY-MM-DD)
+    """
+    return [
+        record
+        for _, records in iter_mandi_batches(date)
+        for record in records
+    ]
+
+
+def fetch_mandi_prices(date):
+    """
+    Fetch mandi prices from data.gov.in for a given date (YYYY-MM-DD)
+    """
+    return pd.DataFrame(fetch_mandi_records(date))
@@ -1,20 +1,33 @@
-import requests
-
-def fetch_rainfall_mm(lat=23.0, lon=72.5):
-    """
-    Fetch today's rainfall (mm) using Open-Meteo
-    Default: Gujarat coordinates
-    """
-    url = "https://api.open-meteo.com/v1/forecast"
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "daily": "precipitation_sum",
-        "timezone": "Asia/Kolkata"
-    }
-
-    response = requests.get(url, params=params, timeout=30)
-    response.raise_for_status()
-
-    data = response.json()
-    return float(data["daily"]["precipitation_sum"][0])
+from datetime import date as date_cls, timedelta
+from updater.session import get_session
+
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+
+# The forecast endpoint also serves roughly the last three months
+FORECAST_PAST_DAYS = 90
+
+
+def fetch_rainfall_mm(lat=23.0, lon=72.5, date=None):
+    """
+    Fetch rainfall (mm) using Open-Meteo, for today or a past date (YYYY-MM-DD)
+    Default: Gujarat coordinates
+    """
+    params = {
+        "latitude": lat,
+        "longitude": lon,
+        "daily": "precipitation_sum",
+        "timezone": "Asia/Kolkata"
+    }
+
+    url = FORECAST_URL
+    if date is not None:
+        params["start_date"] = params["end_date"] = date
+        if date_cls.fromisoformat(date) < date_cls.today() - timedelta(days=FORECAST_PAST_DAYS):
+            url = ARCHIVE_URL
+
+    response = get_session().get(url, params=params, timeout=30)
+    response.raise_for_status()
+
+    data = response.json()
+    return float(data["daily"]["precipitation_sum"][0] or 0.0)
@@ -0,0 +1,22 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# One pooled session shared by all fetchers (and their threads), so
+# repeated calls to the same host reuse TCP/TLS connections
+_session = None
+_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+
+    return _session
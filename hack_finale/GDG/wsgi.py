@@ -0,0 +1,20 @@
+"""
+WSGI entry point for production serving.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Importing this module loads the dataset, the rolling feature state and
+every model. With preload_app=True gunicorn does this once in the master
+before forking, so the workers share those pages copy-on-write and no
+request pays for the Excel/Arrow load or the model deserialization.
+"""
+
+from app import app
+from backend.dataset import commodities
+from backend.feature_state import sync
+from backend.model_registry import preload
+
+print("📦 Preloading dataset and models...")
+sync()
+preload()
+print(f"✅ Preloaded {len(commodities())} commodities")